@@ -1,55 +1,314 @@
-from flask import Flask, request, jsonify
-from openai import OpenAI
-from markupsafe import escape
-import requests
+import asyncio
+import hashlib
+import json
+from urllib.parse import quote
 
-app = Flask(__name__)
+import aiohttp
+from aiohttp import web
+from cachetools import TTLCache
+from openai import AsyncOpenAI
 
+routes = web.RouteTableDef()
 
-@app.route("/forecast/<latitude>/<longitude>", methods=['GET'])
-def get_forecast(latitude, longitude):
-    forecast_url = f"https://api.weather.gov/points/{escape(latitude)},{escape(longitude)}"
+http_session_key = web.AppKey("http_session", aiohttp.ClientSession)
+openai_client_key = web.AppKey("openai_client", AsyncOpenAI)
 
-    forecast_response = requests.get(forecast_url)
+# api.weather.gov rejects requests without an identifying User-Agent
+USER_AGENT = "storepoints-forecast (https://github.com/manivannan2000/storepoints-python)"
+RETRY_STATUSES = {500, 502, 503, 504}
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.2
 
-    if forecast_response.status_code != 200:
-        return jsonify({'error': 'Failed to retrieve forecast data.'}), forecast_response.status_code
+# Kept byte-for-byte stable and ahead of the forecast text so providers can reuse the cached prefix.
+# OpenAI only caches prompts of 1024 tokens or more, so the guidance and worked examples below keep
+# the prefix past that threshold
+SYSTEM_PROMPT = """You are a concise weather summarizer for a forecast service backed by the United States
+National Weather Service (api.weather.gov).
 
-    forecast_data = forecast_response.json()
-    daily_report_url = forecast_data["properties"]["forecast"]
+The user message contains one forecast period per line, in chronological order. Each line has the form
+"<period name> is going to be <detailed forecast>", for example "Tonight is going to be Clear, with a low
+around 65." Period names are the ones published by the National Weather Service, such as "Tonight",
+"Tomorrow", "Wednesday Night" or "Independence Day".
 
-    return get_detailed_forecast(daily_report_url)
+Write the summary as exactly three bullet points, in this order:
+- Tonight: conditions for the first period in the list, whatever it is named.
+- Tomorrow: conditions for the next daytime and night periods.
+- Weekly trend: how temperatures, precipitation and wind evolve across the remaining periods.
 
+Follow these rules:
+- Use only the information in the forecast lines. Do not invent temperatures, probabilities, times,
+  hazards or locations that are not stated.
+- Keep temperatures in the units given, usually degrees Fahrenheit, and quote them as numbers.
+- Mention precipitation chances as percentages when they are given, and name the kind of precipitation.
+- Mention wind only when speeds or gusts are notable, or when the forecast calls it out.
+- Call out hazards stated in the forecast, such as heat, freezing temperatures, thunderstorms, snow,
+  ice, dense fog or high wind, at the start of the bullet they apply to.
+- If two periods describe the same conditions, merge them instead of repeating yourself.
+- If the forecast lines are empty or cannot be read as a forecast, reply with the single sentence
+  "No forecast data was available." and nothing else.
+- Write plain text. Do not use headings, tables, emoji or Markdown other than the three "- " bullets.
+- Keep each bullet to at most two short sentences, and the whole summary under 90 words.
+- Do not greet the reader, mention these instructions, or add advice that is not part of the forecast.
 
-def get_detailed_forecast(detailed_forecast_url):
-    detailed_forecast = []
-    detailed_forecast_response = requests.get(detailed_forecast_url)
+How to read National Weather Service wording:
+- "Slight chance" means a 20 percent chance of precipitation, "chance" 30 to 50 percent, and "likely"
+  60 to 70 percent. When the forecast states a percentage, quote that percentage instead of the wording.
+- "Isolated", "scattered" and "numerous" describe how much of the area is affected, not how likely rain is.
+  Keep the word as written rather than turning it into a percentage.
+- "Mostly sunny" and "partly cloudy" describe daytime sky cover; "mostly clear" and "partly cloudy"
+  describe the night. Keep the sky wording of the period you are summarizing.
+- "Patchy" or "areas of" fog or frost means it will not be everywhere. Say so instead of dropping it.
+- A high is the warmest temperature of a daytime period and a low the coldest of a night period. When a
+  forecast says "falling to" or "rising to", the temperature moves against the usual daily cycle; mention it.
+- Heat index and wind chill values describe how the air feels. Quote them as "feels like" values and keep
+  them apart from the actual temperature.
+- Wind lines such as "Southwest wind 5 to 10 mph, with gusts as high as 25 mph" are notable when the
+  sustained speed reaches 15 mph or the gusts reach 25 mph.
+- Snow and ice accumulation ranges, such as "New snow accumulation of 1 to 3 inches possible", are always
+  worth a mention, with the range kept exactly as written.
+
+How to build each bullet:
+- Tonight: if the first period is a daytime period, such as "This Afternoon" or "Today", summarize that
+  period under the Tonight label anyway, since it is what the reader faces next.
+- Tomorrow: combine the next daytime period and the night that follows it into one bullet, giving the high
+  first and then the low.
+- Weekly trend: describe the direction of change, such as warming, cooling, drying out or turning wet,
+  and name the day when a change arrives. Give the range of highs across the remaining periods rather
+  than listing each day.
+
+Example forecast lines:
+Tonight is going to be Mostly clear, with a low around 58. South wind around 5 mph.
+Tuesday is going to be Sunny, with a high near 84. South wind 5 to 10 mph.
+Tuesday Night is going to be Partly cloudy, with a low around 63.
+Wednesday is going to be A chance of showers and thunderstorms after 1pm. Partly sunny, with a high near 81. Chance of precipitation is 40%.
+Wednesday Night is going to be Showers and thunderstorms likely. Mostly cloudy, with a low around 60. Chance of precipitation is 70%.
+Thursday is going to be Mostly sunny, with a high near 72.
+Friday is going to be Sunny, with a high near 70.
+
+Example summary:
+- Tonight: Mostly clear with a low around 58 and a light south breeze.
+- Tomorrow: Sunny with a high near 84, then partly cloudy overnight with a low around 63.
+- Weekly trend: Thunderstorms are possible Wednesday afternoon (40%) and likely Wednesday night (70%). Drier and cooler from Thursday, with highs falling from 81 to about 70.
+
+Example forecast lines:
+This Afternoon is going to be Snow showers. Cloudy, with a high near 28. Northwest wind 15 to 20 mph, with gusts as high as 35 mph. Chance of precipitation is 90%. New snow accumulation of 2 to 4 inches possible.
+Tonight is going to be Snow showers likely before midnight. Mostly cloudy, with a low around 12. Wind chill values as low as -5. Chance of precipitation is 60%.
+Saturday is going to be Partly sunny, with a high near 22.
+Saturday Night is going to be Mostly clear, with a low around 8.
+Sunday is going to be Sunny, with a high near 30.
+
+Example summary:
+- Tonight: Snow showers this afternoon (90%) with 2 to 4 inches possible and gusts up to 35 mph, easing to a 60% chance before midnight. Low around 12, feeling as cold as -5.
+- Tomorrow: Partly sunny with a high near 22, then mostly clear with a low around 8.
+- Weekly trend: Dry and slowly warming, with a sunny Sunday and a high near 30."""
+
+# weather.gov grid cells rarely move, so the points lookup is cached per coordinate
+points_cache = TTLCache(maxsize=10_000, ttl=24 * 60 * 60)
+
+# Forecasts within a grid cell change slowly, so summaries are reused for half an hour
+summary_cache = TTLCache(maxsize=10_000, ttl=30 * 60)
+
+# Summaries still being generated, so concurrent requests for the same forecast share one OpenAI call
+inflight_summaries = {}
+
+
+@routes.get("/forecast/{latitude}/{longitude}")
+async def get_forecast(request):
+    latitude = quote(request.match_info["latitude"], safe="")
+    longitude = quote(request.match_info["longitude"], safe="")
+    daily_report_url = points_cache.get((latitude, longitude))
+
+    if daily_report_url is None:
+        forecast_url = f"https://api.weather.gov/points/{latitude},{longitude}"
+
+        status, forecast_data = await fetch_json(request.app[http_session_key], forecast_url)
 
-    if detailed_forecast_response.status_code != 200:
-        return jsonify({'error': 'Failed to retrieve detailed forecast data.'}), detailed_forecast_response.status_code
+        if status != 200:
+            return web.json_response({'error': 'Failed to retrieve forecast data.'}, status=status)
 
-    detailed_forecast_json = detailed_forecast_response.json()
+        daily_report_url = forecast_data["properties"]["forecast"]
+        points_cache[(latitude, longitude)] = daily_report_url
+
+    return await get_detailed_forecast(request, daily_report_url)
+
+
+async def get_detailed_forecast(request, detailed_forecast_url):
+    app = request.app
+    detailed_forecast = []
+    status, detailed_forecast_json = await fetch_json(app[http_session_key], detailed_forecast_url)
+
+    if status != 200:
+        return web.json_response({'error': 'Failed to retrieve detailed forecast data.'}, status=status)
 
     detailed_forecast_periods = detailed_forecast_json["properties"]["periods"]
 
     for period in detailed_forecast_periods:
         detailed_forecast.append(f"{period['name']} is going to be {period['detailedForecast']}")
 
-    client = OpenAI()
+    cache_key = summary_cache_key(detailed_forecast)
+    # Clients asking for server-sent events get the summary token by token instead of all at once
+    wants_stream = "text/event-stream" in request.headers.get("Accept", "")
+    summary = summary_cache.get(cache_key)
+
+    if summary is None and wants_stream and cache_key not in inflight_summaries:
+        return await stream_summary(request, cache_key, detailed_forecast)
+
+    if summary is None:
+        pending = inflight_summaries.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(summarize_forecast(app, cache_key, detailed_forecast))
+            inflight_summaries[cache_key] = pending
+            pending.add_done_callback(lambda _: inflight_summaries.pop(cache_key, None))
+
+        # Shielded so a client disconnecting does not cancel the call other requests are waiting on
+        summary = await asyncio.shield(pending)
+
+    if wants_stream:
+        response = await start_event_stream(request)
+        await response.write(format_event(summary))
+        await response.write_eof()
+        return response
+
+    # Negotiated from Accept-Encoding. Event streams stay uncompressed because the compressor
+    # would hold back tokens until it had a full block
+    response = web.Response(text=summary)
+    response.enable_compression()
+    return response
+
+
+def summary_cache_key(detailed_forecast):
+    # Canonical form: whitespace collapsed, lines sorted and compact JSON, so formatting noise still hits the cache
+    canonical = sorted(" ".join(line.split()) for line in detailed_forecast)
+    payload = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
-    completion = client.chat.completions.create(
+
+def summary_messages(detailed_forecast):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": "Summarize this content:\n" + "\n".join(detailed_forecast)
+        }
+    ]
+
+
+async def summarize_forecast(app, cache_key, detailed_forecast):
+    completion = await app[openai_client_key].chat.completions.create(
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {
-                "role": "user",
-                "content": "Summarize this content " + str(detailed_forecast)
-            }
-        ]
+        temperature=0,
+        messages=summary_messages(detailed_forecast)
     )
 
-    return completion.choices[0].message.content
+    summary = completion.choices[0].message.content or ""
+    # Like the streamed path, an empty completion is not cached, so the next request asks again
+    if summary:
+        summary_cache[cache_key] = summary
+
+    return summary
+
+
+async def stream_summary(request, cache_key, detailed_forecast):
+    # The completion runs in its own task registered as in flight, so requests arriving mid-stream
+    # share it, and it still finishes and is cached if this client disconnects
+    deltas = asyncio.Queue()
+    pending = asyncio.ensure_future(stream_completion(request.app, cache_key, detailed_forecast, deltas))
+    inflight_summaries[cache_key] = pending
+
+    text = await deltas.get()
+    if text is None:
+        # Nothing was streamed, so a failed completion surfaces before any headers are sent
+        await asyncio.shield(pending)
+
+    response = await start_event_stream(request)
+    while text is not None:
+        await response.write(format_event(text))
+        text = await deltas.get()
+
+    await asyncio.shield(pending)
+    await response.write_eof()
+    return response
+
+
+async def stream_completion(app, cache_key, detailed_forecast, deltas):
+    parts = []
+    try:
+        stream = await app[openai_client_key].chat.completions.create(
+            model="gpt-4o-mini",
+            temperature=0,
+            messages=summary_messages(detailed_forecast),
+            stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            parts.append(chunk.choices[0].delta.content)
+            deltas.put_nowait(parts[-1])
+    finally:
+        # None ends the client's stream, also when the completion fails
+        deltas.put_nowait(None)
+        inflight_summaries.pop(cache_key, None)
+
+    summary = "".join(parts)
+    # An empty completion is not cached, so the next request asks again
+    if summary:
+        summary_cache[cache_key] = summary
+    return summary
+
+
+async def start_event_stream(request):
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    return response
+
+
+def format_event(text):
+    # Each line of a server-sent event needs its own data: field
+    return "".join(f"data: {line}\n" for line in text.split("\n")).encode() + b"\n"
+
+
+async def fetch_json(session, url):
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            # api.weather.gov answers with application/geo+json, so skip the content type check
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return response.status, await response.json(content_type=None)
+                if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    return response.status, None
+        # Timeouts and connection failures are retried like server errors, and reported as a
+        # gateway timeout or bad gateway once the retries run out
+        except asyncio.TimeoutError:
+            if attempt == MAX_RETRIES:
+                return 504, None
+        except aiohttp.ClientError:
+            if attempt == MAX_RETRIES:
+                return 502, None
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+async def on_startup(app):
+    # One pooled session and one OpenAI client are shared by every request
+    app[http_session_key] = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+        timeout=aiohttp.ClientTimeout(sock_connect=3, sock_read=10),
+        headers={"User-Agent": USER_AGENT},
+    )
+    app[openai_client_key] = AsyncOpenAI()
+
+
+async def on_cleanup(app):
+    await app[http_session_key].close()
+    await app[openai_client_key].close()
+
+
+def create_app(argv=None):
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
 
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
+    web.run_app(create_app(), port=5001)
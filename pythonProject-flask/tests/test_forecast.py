@@ -1,30 +1,39 @@
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
-from flaskr.forecast import app
-from flask import jsonify
-
-class TestForecastApp(unittest.TestCase):
-    def setUp(self):
-        # Sets up the Flask test client
-        self.app = app.test_client()
-        self.app.testing = True
-
-    @patch("flaskr.forecast.requests.get")
-    @patch("flaskr.forecast.OpenAI")
-    def test_get_forecast_success(self, mock_openai, mock_requests_get):
-        # 1. Mock the first requests call (points lookup)
-        mock_points_response = MagicMock()
-        mock_points_response.status_code = 200
-        mock_points_response.json.return_value = {
+from unittest.mock import patch, AsyncMock, MagicMock, ANY
+import aiohttp
+from aiohttp.test_utils import AioHTTPTestCase
+from flaskr.forecast import (create_app, fetch_json, inflight_summaries, points_cache, summary_cache,
+                            summary_cache_key)
+
+class TestForecastApp(AioHTTPTestCase):
+    async def asyncSetUp(self):
+        # Mock the OpenAI client before the startup hook creates it
+        openai_patcher = patch("flaskr.forecast.AsyncOpenAI")
+        self.mock_openai = openai_patcher.start()
+        self.addCleanup(openai_patcher.stop)
+        self.mock_openai_instance = self.mock_openai.return_value
+        self.mock_openai_instance.close = AsyncMock()
+        points_cache.clear()
+        summary_cache.clear()
+        inflight_summaries.clear()
+        await super().asyncSetUp()
+
+    async def get_application(self):
+        # Sets up the aiohttp application served by the test client
+        return create_app()
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_get_forecast_success(self, mock_fetch_json):
+        # 1. Mock the first upstream call (points lookup)
+        points_data = {
             "properties": {
                 "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
             }
         }
 
-        # 2. Mock the second requests call (detailed forecast data)
-        mock_forecast_response = MagicMock()
-        mock_forecast_response.status_code = 200
-        mock_forecast_response.json.return_value = {
+        # 2. Mock the second upstream call (detailed forecast data)
+        forecast_data = {
             "properties": {
                 "periods": [
                     {
@@ -40,56 +49,325 @@ class TestForecastApp(unittest.TestCase):
         }
 
         # Sequence of responses
-        mock_requests_get.side_effect = [mock_points_response, mock_forecast_response]
+        mock_fetch_json.side_effect = [(200, points_data), (200, forecast_data)]
 
         # 3. Mock the OpenAI client
-        mock_openai_instance = mock_openai.return_value
-        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+        self.mock_openai_instance.chat.completions.create = AsyncMock(return_value=MagicMock(
             choices=[MagicMock(message=MagicMock(content="Mocked summary response"))]
-        )
+        ))
 
         # 4. Call the endpoint
-        response = self.app.get("/forecast/35.000/-110.000")
+        response = await self.client.get("/forecast/35.000/-110.000", headers={"Accept-Encoding": "gzip"})
 
         # 5. Assertions
-        self.assertEqual(response.status_code, 200)
-        self.assertIn("Mocked summary response", response.data.decode())
+        self.assertEqual(response.status, 200)
+        self.assertIn("Mocked summary response", await response.text())
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+
+        mock_fetch_json.assert_any_call(ANY, "https://api.weather.gov/points/35.000,-110.000")
+        mock_fetch_json.assert_any_call(ANY, "https://api.weather.gov/gridpoints/ABC/123/forecast")
+
+        self.mock_openai_instance.chat.completions.create.assert_called_once()
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_get_forecast_reuses_cached_points(self, mock_fetch_json):
+        points_data = {
+            "properties": {
+                "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
+            }
+        }
+        forecast_data = {
+            "properties": {
+                "periods": [
+                    {
+                        "name": "Tonight",
+                        "detailedForecast": "Clear with a low around 65."
+                    }
+                ]
+            }
+        }
+
+        # Only the first request needs the points lookup
+        mock_fetch_json.side_effect = [(200, points_data), (200, forecast_data), (200, forecast_data)]
+        self.mock_openai_instance.chat.completions.create = AsyncMock(return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content="Mocked summary response"))]
+        ))
+
+        await self.client.get("/forecast/35.000/-110.000")
+        response = await self.client.get("/forecast/35.000/-110.000")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(mock_fetch_json.call_count, 3)
+        self.assertEqual(mock_fetch_json.call_args_list[2].args[1],
+                         "https://api.weather.gov/gridpoints/ABC/123/forecast")
+
+        # The unchanged forecast is served from the summary cache
+        self.mock_openai_instance.chat.completions.create.assert_called_once()
+        self.assertIn("Mocked summary response", await response.text())
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_concurrent_requests_share_one_summary(self, mock_fetch_json):
+        points_data = {
+            "properties": {
+                "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
+            }
+        }
+        forecast_data = {
+            "properties": {
+                "periods": [
+                    {
+                        "name": "Tonight",
+                        "detailedForecast": "Clear with a low around 65."
+                    }
+                ]
+            }
+        }
+        mock_fetch_json.side_effect = lambda session, url: (
+            (200, points_data) if "/points/" in url else (200, forecast_data)
+        )
+
+        async def slow_completion(**kwargs):
+            # Keep the first call open long enough for the second request to join it
+            await asyncio.sleep(0.05)
+            return MagicMock(choices=[MagicMock(message=MagicMock(content="Mocked summary response"))])
+
+        self.mock_openai_instance.chat.completions.create = AsyncMock(side_effect=slow_completion)
+
+        responses = await asyncio.gather(
+            self.client.get("/forecast/35.000/-110.000"),
+            self.client.get("/forecast/35.000/-110.000"),
+        )
+
+        for response in responses:
+            self.assertEqual(response.status, 200)
+            self.assertIn("Mocked summary response", await response.text())
+        self.mock_openai_instance.chat.completions.create.assert_called_once()
+        self.assertEqual(inflight_summaries, {})
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_get_forecast_streams_events(self, mock_fetch_json):
+        points_data = {
+            "properties": {
+                "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
+            }
+        }
+        forecast_data = {
+            "properties": {
+                "periods": [
+                    {
+                        "name": "Tonight",
+                        "detailedForecast": "Clear with a low around 65."
+                    }
+                ]
+            }
+        }
+        mock_fetch_json.side_effect = [(200, points_data), (200, forecast_data)]
+
+        async def chunks():
+            for text in ["Mocked ", "summary\nresponse"]:
+                yield MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])
+
+        self.mock_openai_instance.chat.completions.create = AsyncMock(return_value=chunks())
+
+        response = await self.client.get("/forecast/35.000/-110.000",
+                                          headers={"Accept": "text/event-stream"})
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+        self.assertEqual(await response.text(), "data: Mocked \n\ndata: summary\ndata: response\n\n")
+        self.assertTrue(self.mock_openai_instance.chat.completions.create.call_args.kwargs["stream"])
+
+        # The streamed text is cached once complete
+        self.assertEqual(list(summary_cache.values()), ["Mocked summary\nresponse"])
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_requests_during_stream_share_one_summary(self, mock_fetch_json):
+        points_data = {
+            "properties": {
+                "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
+            }
+        }
+        forecast_data = {
+            "properties": {
+                "periods": [
+                    {
+                        "name": "Tonight",
+                        "detailedForecast": "Clear with a low around 65."
+                    }
+                ]
+            }
+        }
+        mock_fetch_json.side_effect = lambda session, url: (
+            (200, points_data) if "/points/" in url else (200, forecast_data)
+        )
+
+        async def slow_chunks():
+            # Keep the stream open long enough for the other requests to join it
+            for text in ["Mocked ", "summary response"]:
+                await asyncio.sleep(0.05)
+                yield MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])
+
+        self.mock_openai_instance.chat.completions.create = AsyncMock(return_value=slow_chunks())
+
+        streamed, joined_stream, plain = await asyncio.gather(
+            self.client.get("/forecast/35.000/-110.000", headers={"Accept": "text/event-stream"}),
+            self.client.get("/forecast/35.000/-110.000", headers={"Accept": "text/event-stream"}),
+            self.client.get("/forecast/35.000/-110.000"),
+        )
+
+        self.assertEqual(await streamed.text(), "data: Mocked \n\ndata: summary response\n\n")
+        self.assertEqual(await joined_stream.text(), "data: Mocked summary response\n\n")
+        self.assertEqual(await plain.text(), "Mocked summary response")
+        self.mock_openai_instance.chat.completions.create.assert_called_once()
+        self.assertEqual(inflight_summaries, {})
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_empty_stream_is_not_cached(self, mock_fetch_json):
+        points_data = {
+            "properties": {
+                "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
+            }
+        }
+        forecast_data = {
+            "properties": {
+                "periods": [
+                    {
+                        "name": "Tonight",
+                        "detailedForecast": "Clear with a low around 65."
+                    }
+                ]
+            }
+        }
+        mock_fetch_json.side_effect = [(200, points_data), (200, forecast_data)]
 
-        mock_requests_get.assert_any_call("https://api.weather.gov/points/35.000,-110.000")
-        mock_requests_get.assert_any_call("https://api.weather.gov/gridpoints/ABC/123/forecast")
+        async def no_chunks():
+            return
+            yield
 
-        mock_openai_instance.chat.completions.create.assert_called_once()
+        self.mock_openai_instance.chat.completions.create = AsyncMock(return_value=no_chunks())
 
-    @patch("flaskr.forecast.requests.get")
-    def test_get_forecast_points_api_failure(self, mock_requests_get):
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_requests_get.return_value = mock_response
+        response = await self.client.get("/forecast/35.000/-110.000",
+                                          headers={"Accept": "text/event-stream"})
 
-        response = self.app.get("/forecast/35.000/-110.000")
-        self.assertEqual(response.status_code, 404)
-        self.assertIn("Failed to retrieve forecast data.", response.data.decode())
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.text(), "")
+        self.assertEqual(len(summary_cache), 0)
+        self.assertEqual(inflight_summaries, {})
 
-    @patch("flaskr.forecast.requests.get")
-    def test_get_detailed_forecast_api_failure(self, mock_requests_get):
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_empty_summary_is_not_cached(self, mock_fetch_json):
+        points_data = {
+            "properties": {
+                "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
+            }
+        }
+        forecast_data = {
+            "properties": {
+                "periods": [
+                    {
+                        "name": "Tonight",
+                        "detailedForecast": "Clear with a low around 65."
+                    }
+                ]
+            }
+        }
+        mock_fetch_json.side_effect = [(200, points_data), (200, forecast_data)]
+
+        mock_completion = MagicMock(choices=[MagicMock(message=MagicMock(content=None))])
+        self.mock_openai_instance.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        response = await self.client.get("/forecast/35.000/-110.000")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.text(), "")
+        self.assertEqual(len(summary_cache), 0)
+        self.assertEqual(inflight_summaries, {})
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_get_forecast_points_api_failure(self, mock_fetch_json):
+        mock_fetch_json.return_value = (404, None)
+
+        response = await self.client.get("/forecast/35.000/-110.000")
+        self.assertEqual(response.status, 404)
+        self.assertIn("Failed to retrieve forecast data.", await response.text())
+
+    @patch("flaskr.forecast.fetch_json", new_callable=AsyncMock)
+    async def test_get_detailed_forecast_api_failure(self, mock_fetch_json):
         # The points API call succeeds
-        mock_points_response = MagicMock()
-        mock_points_response.status_code = 200
-        mock_points_response.json.return_value = {
+        points_data = {
             "properties": {
                 "forecast": "https://api.weather.gov/gridpoints/ABC/123/forecast"
             }
         }
 
         # The second call fails
-        mock_forecast_response = MagicMock()
-        mock_forecast_response.status_code = 500
+        mock_fetch_json.side_effect = [(200, points_data), (500, None)]
+
+        response = await self.client.get("/forecast/35.000/-110.000")
+        self.assertEqual(response.status, 500)
+        self.assertIn("Failed to retrieve detailed forecast data.", await response.text())
+
+    @patch("flaskr.forecast.asyncio.sleep", new_callable=AsyncMock)
+    async def test_fetch_json_retries_server_errors(self, mock_sleep):
+        # The first attempt hits a transient 503, the retry succeeds
+        unavailable = MagicMock(status=503)
+        ok = MagicMock(status=200)
+        ok.json = AsyncMock(return_value={"properties": {}})
+        session = MagicMock()
+        session.get.return_value.__aenter__.side_effect = [unavailable, ok]
+
+        status, data = await fetch_json(session, "https://api.weather.gov/points/35.000,-110.000")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {"properties": {}})
+        self.assertEqual(session.get.call_count, 2)
+        mock_sleep.assert_awaited_once()
+
+    @patch("flaskr.forecast.asyncio.sleep", new_callable=AsyncMock)
+    async def test_fetch_json_retries_timeouts(self, mock_sleep):
+        # The first attempt times out, the retry succeeds
+        ok = MagicMock(status=200)
+        ok.json = AsyncMock(return_value={"properties": {}})
+        session = MagicMock()
+        session.get.return_value.__aenter__.side_effect = [asyncio.TimeoutError(), ok]
+
+        status, data = await fetch_json(session, "https://api.weather.gov/points/35.000,-110.000")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {"properties": {}})
+        self.assertEqual(session.get.call_count, 2)
+        mock_sleep.assert_awaited_once()
+
+    @patch("flaskr.forecast.asyncio.sleep", new_callable=AsyncMock)
+    async def test_fetch_json_gives_up_after_timeouts(self, mock_sleep):
+        session = MagicMock()
+        session.get.return_value.__aenter__.side_effect = asyncio.TimeoutError()
+
+        status, data = await fetch_json(session, "https://api.weather.gov/points/35.000,-110.000")
+
+        self.assertEqual((status, data), (504, None))
+        self.assertEqual(session.get.call_count, 3)
+
+    @patch("flaskr.forecast.asyncio.sleep", new_callable=AsyncMock)
+    async def test_fetch_json_gives_up_after_connection_errors(self, mock_sleep):
+        session = MagicMock()
+        session.get.return_value.__aenter__.side_effect = aiohttp.ClientConnectionError()
+
+        status, data = await fetch_json(session, "https://api.weather.gov/points/35.000,-110.000")
+
+        self.assertEqual((status, data), (502, None))
+        self.assertEqual(session.get.call_count, 3)
 
-        mock_requests_get.side_effect = [mock_points_response, mock_forecast_response]
+    def test_summary_cache_key_ignores_formatting(self):
+        forecast = ["Tonight is going to be Clear with a low around 65.",
+                    "Tomorrow is going to be Sunny with a high near 85."]
+        reformatted = ["Tomorrow is going to be  Sunny with a high near 85. ",
+                       "Tonight is going to be Clear with a low around 65."]
+        changed = ["Tonight is going to be Clear with a low around 64.",
+                   "Tomorrow is going to be Sunny with a high near 85."]
 
-        response = self.app.get("/forecast/35.000/-110.000")
-        self.assertEqual(response.status_code, 500)
-        self.assertIn("Failed to retrieve detailed forecast data.", response.data.decode())
+        self.assertEqual(summary_cache_key(forecast), summary_cache_key(reformatted))
+        self.assertNotEqual(summary_cache_key(forecast), summary_cache_key(changed))
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,10 @@
+import functools
+import os
+
+from google import genai
+
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    # One client per process, so every call reuses the same pooled HTTP connection
+    return genai.Client(api_key=os.environ["GEMINI_API_KEY"])
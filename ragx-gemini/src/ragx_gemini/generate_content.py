@@ -1,10 +1,6 @@
-import os
-from google import genai
+from ragx_gemini._client import get_client
 
-
-api_key = os.environ["GEMINI_API_KEY"]
-
-client = genai.Client(api_key=api_key)
+client = get_client()
 
 response = client.models.generate_content(
     model="gemini-2.0-flash", contents="Explain how AI works in a few words"
@@ -1,12 +1,39 @@
-import os
+import hashlib
+import io
+from pathlib import Path
+
 from PIL import Image
-from google import genai
+from google.genai import types
+
+from ragx_gemini._client import get_client
+
+IMAGE_PATH = Path("../../images/beautiful-sitar-classical-music-instrument_96037-395.png")
+CACHE_DIR = IMAGE_PATH.parent / ".cache"
+# Gemini scales images down to about 768x768 tiles, so larger uploads only cost bytes and tokens
+MAX_SIZE = (1024, 1024)
+
+
+def load_image_bytes(path):
+    # Downscaled copies are cached per path and modification time, so reruns skip re-encoding
+    stat = path.stat()
+    key = hashlib.sha256(f"{path.resolve()}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+    cached = CACHE_DIR / f"{path.stem}-{key}.jpg"
+    if cached.exists():
+        return cached.read_bytes()
+
+    with Image.open(path) as image:
+        image.thumbnail(MAX_SIZE, Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=85, optimize=True)
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    cached.write_bytes(buffer.getvalue())
+    return buffer.getvalue()
 
-api_key = os.environ["GEMINI_API_KEY"]
 
-client = genai.Client(api_key=api_key)
+client = get_client()
 
-image = Image.open("../../images/beautiful-sitar-classical-music-instrument_96037-395.png")
+image = types.Part.from_bytes(data=load_image_bytes(IMAGE_PATH), mime_type="image/jpeg")
 response = client.models.generate_content(
     model="gemini-2.0-flash",
     contents=[image, "Tell me about this instrument"]
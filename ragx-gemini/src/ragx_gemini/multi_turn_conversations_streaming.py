@@ -1,10 +1,6 @@
-import os
-from google import genai
+from ragx_gemini._client import get_client
 
-api_key = os.environ["GEMINI_API_KEY"]
-
-
-client = genai.Client(api_key=api_key)
+client = get_client()
 chat = client.chats.create(model="gemini-2.0-flash")
 
 response = chat.send_message_stream("I have 2 cats in my house.")
@@ -1,10 +1,8 @@
-import os
-from google import genai
 from google.genai import types
 
-api_key = os.environ["GEMINI_API_KEY"]
+from ragx_gemini._client import get_client
 
-client = genai.Client(api_key=api_key)
+client = get_client()
 
 response = client.models.generate_content(
     model="gemini-2.0-flash",
@@ -1,8 +1,25 @@
-import json
+import bisect
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Any
+from functools import cached_property
+from typing import List, Dict, Optional, Tuple, Any
 
+from parking_spaces._common import intern_id, parse_timestamp
+from parking_spaces._io import load_json
 
+
+def _parse_timestamp(timestamp: str) -> Optional[datetime]:
+    """
+    Parses an ISO timestamp with the shared cached parser, returning None if it is not valid.
+    """
+    try:
+        return parse_timestamp(timestamp)
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True, frozen=True)
 class TrailerEvent:
     """
     Represents a single trailer event in the yard.
@@ -10,26 +27,14 @@ class TrailerEvent:
     or a loading/unloading action, etc.
     """
 
-    def __init__(
-            self,
-            event_id: str,
-            yard_id: str,
-            event_type: str,
-            timestamp: str,
-            trailer_id: str
-    ):
-        self.event_id = event_id
-        self.yard_id = yard_id
-        self.event_type = event_type
-        self.timestamp_str = timestamp
-        self.trailer_id = trailer_id
-
-        # Attempt to parse the timestamp into a datetime object
-        # for easier comparison, grouping, etc.
-        try:
-            self.timestamp = datetime.fromisoformat(timestamp)
-        except ValueError:
-            self.timestamp = None
+    event_id: str
+    yard_id: str
+    event_type: str
+    timestamp_str: str
+    trailer_id: str
+    # Parsed form of timestamp_str for easier comparison, grouping, etc.;
+    # None when the string is not a valid ISO timestamp
+    timestamp: Optional[datetime]
 
     def __repr__(self) -> str:
         return (
@@ -51,35 +56,57 @@ class TrailerEventAnalyzer:
         """
         self.filepath = filepath
         self.events: List[TrailerEvent] = []
+        # Events bucketed by yard, and each queried yard's (earliest, latest, count) of timestamped events
+        self._events_by_yard: Dict[str, List[TrailerEvent]] = {}
+        self._yard_spans: Dict[str, Optional[Tuple[datetime, datetime, int]]] = {}
 
     def load_data(self) -> None:
         """
         Loads the event data from the specified JSON file
         and populates a list of TrailerEvent objects.
         """
-        with open(self.filepath, 'r') as file:
-            data = json.load(file)  # Expecting a list of event records in JSON
+        data = load_json(self.filepath)  # Expecting a list of event records in JSON
 
-        # Parse each JSON record into a TrailerEvent object
+        # Parse each JSON record into a TrailerEvent object. IDs and event types repeat
+        # across records, so they are interned to share one string object per value.
         self.events = [
             TrailerEvent(
                 event_id=record["event_id"],
-                yard_id=record["yard_id"],
-                event_type=record["event_type"],
-                timestamp=record["timestamp"],
-                trailer_id=record["trailer_id"]
+                yard_id=intern_id(record["yard_id"]),
+                event_type=intern_id(record["event_type"]),
+                timestamp_str=record["timestamp"],
+                trailer_id=intern_id(record["trailer_id"]),
+                timestamp=_parse_timestamp(record["timestamp"])
             )
             for record in data
         ]
 
+        self._events_by_yard = {}
+        for event in self.events:
+            self._events_by_yard.setdefault(event.yard_id, []).append(event)
+
+        # Indexes over the previous load are dropped and rebuilt on the next query
+        self._yard_spans = {}
+        self.__dict__.pop("_timeline", None)
+
+    @cached_property
+    def _timeline(self) -> Tuple[List[TrailerEvent], List[datetime]]:
+        """
+        Events with a valid timestamp sorted by it, plus the parallel list of keys for bisect.
+        Built on the first range query rather than in load_data, so a file mixing naive and
+        offset timestamps still loads; only queries that compare them can fail.
+        """
+        sorted_events = sorted(
+            (event for event in self.events if event.timestamp is not None),
+            key=lambda event: event.timestamp
+        )
+        return sorted_events, [event.timestamp for event in sorted_events]
+
     def get_event_count_by_yard(self) -> Dict[str, int]:
         """
         Returns a dictionary mapping each yard_id to its count of events.
         """
-        yard_counts: Dict[str, int] = {}
-        for event in self.events:
-            yard_counts[event.yard_id] = yard_counts.get(event.yard_id, 0) + 1
-        return yard_counts
+        return dict(Counter(event.yard_id for event in self.events))
 
     def get_most_frequent_event_type(self) -> str:
         """
@@ -88,25 +115,16 @@ class TrailerEventAnalyzer:
         """
         if not self.events:
             return ""
-        event_type_counts: Dict[str, int] = {}
-        for event in self.events:
-            event_type_counts[event.event_type] = (
-                    event_type_counts.get(event.event_type, 0) + 1
-            )
-        # Find the event type with the maximum count
-        return max(event_type_counts, key=event_type_counts.get)
+        # most_common keeps first-seen order for ties, matching the previous max() lookup
+        return Counter(event.event_type for event in self.events).most_common(1)[0][0]
 
     def get_event_distribution_for_yard(self, yard_id: str) -> Dict[str, int]:
         """
         Returns a dictionary of event_type -> count for the specified yard.
         """
-        distribution: Dict[str, int] = {}
-        for event in self.events:
-            if event.yard_id == yard_id:
-                distribution[event.event_type] = (
-                        distribution.get(event.event_type, 0) + 1
-                )
-        return distribution
+        return dict(Counter(
+            event.event_type for event in self._events_by_yard.get(yard_id, [])
+        ))
 
     def get_average_events_per_day(self, yard_id: str) -> float:
         """
@@ -118,18 +136,13 @@ class TrailerEventAnalyzer:
 
         Returns 0.0 if no events or if time range is invalid.
         """
-        yard_events = [e for e in self.events if e.yard_id == yard_id]
-        if not yard_events:
+        # Earliest/latest timestamps and event count are computed once per yard, on first query
+        if yard_id not in self._yard_spans:
+            self._yard_spans[yard_id] = self._yard_span(yard_id)
+        span = self._yard_spans[yard_id]
+        if span is None:
             return 0.0
-
-        valid_events = [e for e in yard_events if e.timestamp is not None]
-        if not valid_events:
-            return 0.0
-
-        # Sort events by timestamp
-        valid_events.sort(key=lambda x: x.timestamp)
-        start_time = valid_events[0].timestamp
-        end_time = valid_events[-1].timestamp
+        start_time, end_time, event_count = span
 
         # Calculate total days in range
         days_diff = (end_time - start_time).days
@@ -138,17 +151,24 @@ class TrailerEventAnalyzer:
         days_diff = max(days_diff, 1)
 
         # Average events per day
-        return len(valid_events) / days_diff
+        return event_count / days_diff
+
+    def _yard_span(self, yard_id: str) -> Optional[Tuple[datetime, datetime, int]]:
+        timestamps = [event.timestamp for event in self._events_by_yard.get(yard_id, [])
+                      if event.timestamp is not None]
+        if not timestamps:
+            return None
+        return min(timestamps), max(timestamps), len(timestamps)
 
     def get_events_in_timerange(self, start: datetime, end: datetime) -> List[TrailerEvent]:
         """
-        Returns all events occurring within the specified [start, end] datetime range.
+        Returns all events occurring within the specified [start, end] datetime range,
+        ordered by timestamp.
         """
-        return [
-            event
-            for event in self.events
-            if event.timestamp is not None and start <= event.timestamp <= end
-        ]
+        sorted_events, sorted_timestamps = self._timeline
+        lo = bisect.bisect_left(sorted_timestamps, start)
+        hi = bisect.bisect_right(sorted_timestamps, end)
+        return sorted_events[lo:hi]
 
 
 def main():
@@ -0,0 +1,156 @@
+'''
+Helpers shared by the parking_spaces modules: timestamp parsing, the peak-hour sweep and the
+per-yard granular statistics. The modules import what they use from here.
+'''
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+import sys
+
+
+# Event streams repeat timestamps a lot, so parsed values are cached
+@lru_cache(maxsize=4096)
+def parse_timestamp(timestamp):
+    # Python 3.10's fromisoformat rejects the "Z" UTC suffix that many event feeds use
+    if timestamp.endswith("Z"):
+        timestamp = timestamp[:-1] + "+00:00"
+    return datetime.fromisoformat(timestamp)
+
+
+# IDs repeat across records, so strings are interned to share one object per value. Numeric or
+# null IDs are passed through unchanged, since sys.intern only accepts str
+def intern_id(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Stays spread over at most this many hours are counted in a dense per-hour list
+DENSE_SPAN_HOURS = 366 * 24
+
+
+def sweep_peak_hours(stays):
+    # Sweep line over hour boundaries: +1 where a stay's first hour starts and -1 after its last hour,
+    # so the cost depends on the number of stays rather than on how long each one lasts. Stays sharing
+    # a boundary fold into one net change, so only distinct hours are sorted. Hours are integer wall-clock
+    # buckets (days since year 1 * 24 + hour), so no datetime is built per stay; only peak hours are
+    # turned back into datetimes. Aware timestamps are moved to the zone of the first aware one, so data
+    # with a single offset keeps its wall-clock buckets while stays recorded with other offsets still
+    # share buckets with it
+    deltas = defaultdict(int)
+    anchor = None
+    zone = None
+    for arrival, departure in stays:
+        if arrival.tzinfo is not None:
+            zone = zone or arrival.tzinfo
+            arrival = arrival.astimezone(zone)
+        if departure.tzinfo is not None:
+            zone = zone or departure.tzinfo
+            departure = departure.astimezone(zone)
+        start = arrival.toordinal() * 24 + arrival.hour
+        end = departure.toordinal() * 24 + departure.hour
+        if departure.minute or departure.second or departure.microsecond:
+            end += 1
+        if start < end:
+            deltas[start] += 1
+            deltas[end] -= 1
+            if anchor is None:
+                anchor = arrival
+    if not deltas:
+        return 0, []
+
+    hour = timedelta(hours=1)
+    origin = min(deltas)
+    span = max(deltas) - origin
+    # The datetime of the earliest bucket, keeping the stays' tzinfo
+    first_hour = anchor.replace(minute=0, second=0, microsecond=0) + \
+        (origin - anchor.toordinal() * 24 - anchor.hour) * hour
+
+    if span <= DENSE_SPAN_HOURS:
+        # Short spans fit a flat per-hour list, so a running sum replaces the sort
+        counts = [0] * span
+        for bucket, delta in deltas.items():
+            if bucket - origin < span:
+                counts[bucket - origin] += delta
+        occupancy = list(accumulate(counts))
+        max_utilization = max(occupancy)
+        return max_utilization, [first_hour + index * hour for index, count in enumerate(occupancy)
+                                 if count == max_utilization]
+
+    boundaries = sorted(deltas)
+
+    max_utilization = 0
+    peak_spans = []
+    current = 0
+    for bucket, next_bucket in zip(boundaries, boundaries[1:]):
+        current += deltas[bucket]
+        if current == 0:
+            continue
+        bucket_span = (bucket, next_bucket)
+        if current > max_utilization:
+            max_utilization = current
+            peak_spans = [bucket_span]
+        elif current == max_utilization:
+            peak_spans.append(bucket_span)
+
+    peak_hours = [
+        first_hour + (bucket - origin) * hour
+        for start, end in peak_spans
+        for bucket in range(start, end)
+    ]
+
+    return max_utilization, peak_hours
+
+
+def calculate_granular_statistics(yard_data):
+    yard_summaries = {}
+    microsecond = timedelta(microseconds=1)
+
+    for yard_id, data in yard_data.items():
+        # Durations are summed and compared as integer microseconds; timedeltas are only built for the summary.
+        # One pass collects the total, the unique count and both extremes; strict comparisons keep the first
+        # trailer seen on ties
+        trailer_micros = {}
+        total_micros = 0
+        unique_trailers = 0
+        most_time_trailer = least_time_trailer = None
+        most_micros = least_micros = 0
+
+        for trailer_id, duration_data in data["trailer_durations"].items():
+            micros = duration_data["total_time"] // microsecond
+            trailer_micros[trailer_id] = micros
+            total_micros += micros
+            if micros > 0:
+                unique_trailers += 1
+            if most_time_trailer is None:
+                most_time_trailer = least_time_trailer = trailer_id
+                most_micros = least_micros = micros
+            elif micros > most_micros:
+                most_time_trailer, most_micros = trailer_id, micros
+            elif micros < least_micros:
+                least_time_trailer, least_micros = trailer_id, micros
+
+        if trailer_micros:
+            average_time = timedelta(microseconds=total_micros) / len(trailer_micros)
+        else:
+            average_time = timedelta(0)
+
+        # The guard is loop-invariant, and one division up front turns each share into a multiply
+        if total_micros > 0:
+            scale = 100 / total_micros
+            trailer_percentages = {trailer_id: micros * scale for trailer_id, micros in trailer_micros.items()}
+        else:
+            trailer_percentages = {}
+
+        yard_summaries[yard_id] = {
+            "total_time": timedelta(microseconds=total_micros),
+            "average_time_per_trailer": average_time,
+            "most_time_trailer": most_time_trailer,
+            "most_time_duration": timedelta(microseconds=most_micros),
+            "least_time_trailer": least_time_trailer,
+            "least_time_duration": timedelta(microseconds=least_micros),
+            "unique_trailers": unique_trailers,
+            "trailer_percentages": trailer_percentages,
+        }
+
+    return yard_summaries
@@ -0,0 +1,26 @@
+'''
+Shared loaders for the trailer event files used by the parking_spaces modules.
+Each module re-exports the ones it offers in its __all__, so callers keep importing them from there.
+'''
+
+import ijson
+import orjson
+
+
+# Step 1: Load the JSON dataset
+def load_json(file_path):
+    with open(file_path, 'rb') as f:
+        data = orjson.loads(f.read())
+    return data
+
+
+# Streams the events one at a time, so memory stays flat however large the file is
+def iter_json(file_path):
+    with open(file_path, 'rb') as f:
+        yield from ijson.items(f, 'item')
+
+
+# Newline-delimited JSON: one event per line, decoded line by line without holding the raw file
+def load_ndjson(file_path):
+    with open(file_path, 'rb') as f:
+        return [orjson.loads(line) for line in f if line.strip()]
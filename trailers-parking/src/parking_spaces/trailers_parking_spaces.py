@@ -45,41 +45,55 @@ Trailers spending the most/least time in a yard.
 '''
 
 
-import json
-from datetime import datetime
-from collections import defaultdict
-from typing import List, DefaultDict, Any
-
-# Step 1: Load the JSON dataset
-def load_json(file_path):
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    return data
+from datetime import timedelta
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from itertools import chain
+from pathlib import Path
+from typing import List, DefaultDict, Optional, Tuple, Any
+
+from parking_spaces._common import intern_id, parse_timestamp
+from parking_spaces._io import iter_json, load_json, load_ndjson
+
+__all__ = [
+    "load_json",
+    "iter_json",
+    "load_ndjson",
+    "process_events",
+    "calculate_utilization",
+    "summarize_events",
+    "display_results",
+    "TrailerEvent",
+    "TrailerEventAnalyzer",
+]
 
 # Step 2: Process events to extract insights
 def process_events(events):
     # Metrics
     yard_stats = defaultdict(lambda: {"arrivals": 0, "departures": 0})
     parking_utilization = defaultdict(list)  # {parking_space: [(arrival_time, departure_time)]}
+    open_arrivals = defaultdict(deque)  # {(parking_space, trailer_id): entries still waiting for a departure}
 
     for event in events:
         yard_id = event["yard_id"]
         event_type = event["event_type"]
         parking_space = event["parking_space"]
         trailer_id = event["trailer_id"]
-        timestamp = datetime.fromisoformat(event["timestamp"])
+        timestamp = parse_timestamp(event["timestamp"])
 
         # Count arrivals and departures by yard
         if event_type == "arrived":
             yard_stats[yard_id]["arrivals"] += 1
-            parking_utilization[parking_space].append({"trailer_id": trailer_id, "arrival_time": timestamp})
+            entry = {"trailer_id": trailer_id, "arrival_time": timestamp}
+            parking_utilization[parking_space].append(entry)
+            open_arrivals[(parking_space, trailer_id)].append(entry)
         elif event_type == "departed":
             yard_stats[yard_id]["departures"] += 1
-            # Match departure with previous arrival for the same trailer
-            for entry in parking_utilization[parking_space]:
-                if entry["trailer_id"] == trailer_id and "departure_time" not in entry:
-                    entry["departure_time"] = timestamp
-                    break
+            # Match departure with the earliest unmatched arrival for the same trailer
+            waiting = open_arrivals.get((parking_space, trailer_id))
+            if waiting:
+                waiting.popleft()["departure_time"] = timestamp
 
     return yard_stats, parking_utilization
 
@@ -87,14 +101,38 @@ def process_events(events):
 def calculate_utilization(parking_utilization):
     utilization_stats = {}
     for parking_space, usage in parking_utilization.items():
-        total_time = 0
-        for entry in usage:
-            if "departure_time" in entry:
-                duration = (entry["departure_time"] - entry["arrival_time"]).total_seconds() / 3600  # Hours
-                total_time += duration
-        utilization_stats[parking_space] = total_time
+        # Durations are summed as exact timedeltas and converted to hours once per space
+        total_time = sum(
+            (entry["departure_time"] - entry["arrival_time"] for entry in usage if "departure_time" in entry),
+            timedelta(0)
+        )
+        utilization_stats[parking_space] = total_time.total_seconds() / 3600  # Hours
     return utilization_stats
 
+# Steps 2 and 3 in one pass: usage time is accumulated per space as departures are matched,
+# without building the per-space lists of arrival/departure entries
+def summarize_events(events):
+    yard_stats = defaultdict(lambda: {"arrivals": 0, "departures": 0})
+    usage = {}  # {parking_space: total timedelta of completed stays}
+    open_arrivals = defaultdict(deque)  # {(parking_space, trailer_id): arrival times still waiting for a departure}
+
+    for event in events:
+        event_type = event["event_type"]
+        parking_space = event["parking_space"]
+
+        if event_type == "arrived":
+            yard_stats[event["yard_id"]]["arrivals"] += 1
+            usage.setdefault(parking_space, timedelta(0))
+            open_arrivals[(parking_space, event["trailer_id"])].append(parse_timestamp(event["timestamp"]))
+        elif event_type == "departed":
+            yard_stats[event["yard_id"]]["departures"] += 1
+            waiting = open_arrivals.get((parking_space, event["trailer_id"]))
+            if waiting:
+                usage[parking_space] += parse_timestamp(event["timestamp"]) - waiting.popleft()
+
+    utilization_stats = {space: total.total_seconds() / 3600 for space, total in usage.items()}  # Hours
+    return yard_stats, utilization_stats
+
 # Step 4: Display results
 def display_results(yard_stats, utilization_stats):
     print("Yard Stats:")
@@ -110,6 +148,9 @@ class TrailerEvent:
     """
     represents a single Trailer event in the park
     """
+    # No per-instance __dict__: large event logs keep millions of these alive
+    __slots__ = ("event_id", "yard_id", "event_type", "parking_space", "timestamp", "trailer_id")
+
     def __init__(self,
                  event_id: str,
                  yard_id: str,
@@ -125,7 +166,7 @@ class TrailerEvent:
         self.trailer_id = trailer_id
 
         try:
-            self.timestamp = datetime.fromisoformat(timestamp)
+            self.timestamp = parse_timestamp(timestamp)
         except ValueError:
             self.timestamp = None
 
@@ -133,75 +174,110 @@ class TrailerEventAnalyzer:
 
     def __init__(self, filepath: str):
         """
-        Initialize the analyzer with data file path
+        Initialize the analyzer with a data file path, or a directory of
+        JSON files (for example one file per day)
         """
         self.filepath = filepath
         self.events: List[TrailerEvent] = []
 
-    def load_data(self) -> None:
-        with open(self.filepath, 'r') as file:
-            data = json.load(file)
+    def load_data(self, max_workers: Optional[int] = None) -> None:
+        if Path(self.filepath).is_dir():
+            # Files are decoded in worker processes and concatenated in name order
+            file_paths = sorted(Path(self.filepath).glob("*.json"))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                data = list(chain.from_iterable(executor.map(load_json, file_paths)))
+        else:
+            data = load_json(self.filepath)
+
+        # Results derived from the previous load are dropped so they are rebuilt on next access
+        for name in ("summary", "yard_stats", "utilization_stats", "parking_departure"):
+            self.__dict__.pop(name, None)
 
+        # IDs and event types repeat across records, so intern them to share one string per value
         self.events = [
             TrailerEvent(
                 event_id=record["event_id"],
-                yard_id=record["yard_id"],
-                event_type=record["event_type"],
-                parking_space=record["parking_space"],
+                yard_id=intern_id(record["yard_id"]),
+                event_type=intern_id(record["event_type"]),
+                parking_space=intern_id(record["parking_space"]),
                 timestamp=record["timestamp"],
-                trailer_id=record["trailer_id"]
+                trailer_id=intern_id(record["trailer_id"])
             )
             for record in data
         ]
 
-    def get_yard_stats(self) -> DefaultDict[str, int]:
-        yard_statistics2: DefaultDict[str, int] = defaultdict(lambda: {"arrivals": 0, "departures": 0})
+    @cached_property
+    def summary(self) -> Tuple[DefaultDict[str, dict], dict]:
+        """
+        Walks the events once, building the yard stats and the usage hours per
+        parking space together. The result is kept until load_data runs again.
+        """
+        yard_statistics: DefaultDict[str, dict] = defaultdict(lambda: {"arrivals": 0, "departures": 0})
+        util_hours: dict = {}
+        open_arrivals: DefaultDict[tuple, deque] = defaultdict(deque)
 
         for event in self.events:
             if event.event_type == 'arrived':
-                yard_statistics2[event.yard_id]["arrivals"] += 1
+                yard_statistics[event.yard_id]["arrivals"] += 1
+                util_hours.setdefault(event.parking_space, 0)
+                open_arrivals[(event.parking_space, event.trailer_id)].append(event.timestamp)
             elif event.event_type == 'departed':
-                yard_statistics2[event.yard_id]["departures"] += 1
-
-        return yard_statistics2
-
-    def get_parking_departure(self) -> DefaultDict[str, list]:
+                yard_statistics[event.yard_id]["departures"] += 1
+                # Spaces seen only on departures are still reported, with no hours
+                util_hours.setdefault(event.parking_space, 0)
+                waiting = open_arrivals.get((event.parking_space, event.trailer_id))
+                if waiting:
+                    arrival_time = waiting.popleft()
+                    # Unparseable timestamps are stored as None; the visit still counts but adds no time
+                    if arrival_time is not None and event.timestamp is not None:
+                        util_hours[event.parking_space] += (event.timestamp - arrival_time).total_seconds() // 3600
+
+        return yard_statistics, util_hours
+
+    @cached_property
+    def yard_stats(self) -> DefaultDict[str, dict]:
+        return self.summary[0]
+
+    @cached_property
+    def utilization_stats(self) -> dict:
+        return self.summary[1]
+
+    @cached_property
+    def parking_departure(self) -> DefaultDict[str, list]:
         park_util: DefaultDict[str, list] = defaultdict(list)
+        open_arrivals: DefaultDict[tuple, deque] = defaultdict(deque)
 
         for event in self.events:
             if event.event_type == "arrived":
-                park_util[event.parking_space].append(
-                {"trailer_id": event.trailer_id, "arrival_time": event.timestamp})
+                entry = {"trailer_id": event.trailer_id, "arrival_time": event.timestamp}
+                park_util[event.parking_space].append(entry)
+                open_arrivals[(event.parking_space, event.trailer_id)].append(entry)
             elif event.event_type == "departed":
-                for entry in park_util[event.parking_space]:
-                    if entry["trailer_id"]== event.trailer_id and "departure_time" not in entry:
-                        entry["departure_time"] = event.timestamp
+                # Spaces seen only on departures are still listed, with no stays
+                park_util[event.parking_space]
+                waiting = open_arrivals.get((event.parking_space, event.trailer_id))
+                if waiting:
+                    waiting.popleft()["departure_time"] = event.timestamp
 
         return park_util
 
+    def compute_all(self) -> Tuple[DefaultDict[str, dict], dict]:
+        return self.summary
+
+    def get_yard_stats(self) -> DefaultDict[str, dict]:
+        return self.yard_stats
+
+    def get_parking_departure(self) -> DefaultDict[str, list]:
+        return self.parking_departure
+
     def get_utilization_stats(self) -> dict:
-        util_stats = {}
-        park_util = self.get_parking_departure()
-        print()
-        print(park_util)
-        print()
-
-        for park_space, item in park_util.items():
-            total_time=0
-            for entry in item:
-                if "departure_time" in entry:
-                    duration = (entry["departure_time"] - entry["arrival_time"]).total_seconds() // 3600
-                    total_time += duration
-            util_stats[park_space] = total_time
-
-        return util_stats
+        return self.utilization_stats
 
 # Main Function
 if __name__ == "__main__":
     file_path = "../data_set/events.json"  # Replace with your JSON file path
-    events = load_json(file_path)
-    yard_stats, parking_utilization = process_events(events)
-    utilization_stats = calculate_utilization(parking_utilization)
+    events = iter_json(file_path)
+    yard_stats, utilization_stats = summarize_events(events)
     display_results(yard_stats, utilization_stats)
 
     print()
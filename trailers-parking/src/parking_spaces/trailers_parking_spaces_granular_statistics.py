@@ -40,15 +40,19 @@ This enhanced solution offers a complete view of yard utilization and trailer ac
 '''
 
 from collections import defaultdict
-from datetime import datetime, timedelta
-import json
+from datetime import timedelta
+import sys
 
+from parking_spaces._common import calculate_granular_statistics, parse_timestamp
+from parking_spaces._io import iter_json, load_json
 
-# Step 1: Load the JSON dataset
-def load_json(file_path):
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    return data
+__all__ = [
+    "load_json",
+    "iter_json",
+    "calculate_granular_statistics",
+    "process_events",
+    "display_granular_statistics",
+]
 
 
 # Step 2: Process events to track yard and trailer statistics
@@ -60,87 +64,50 @@ def process_events(events):
     })
 
     for event in events:
-        yard_id = event["yard_id"]
-        trailer_id = event["trailer_id"]
-        timestamp = datetime.fromisoformat(event["timestamp"])
         event_type = event["event_type"]
 
         if event_type == "arrived":
-            yard_data[yard_id]["arrivals"] += 1
-            yard_data[yard_id]["trailer_durations"][trailer_id]["arrival_time"] = timestamp
+            yard = yard_data[event["yard_id"]]
+            yard["arrivals"] += 1
+            yard["trailer_durations"][event["trailer_id"]]["arrival_time"] = parse_timestamp(event["timestamp"])
         elif event_type == "departed":
-            yard_data[yard_id]["departures"] += 1
-            trailer_info = yard_data[yard_id]["trailer_durations"][trailer_id]
+            yard = yard_data[event["yard_id"]]
+            yard["departures"] += 1
+            trailer_info = yard["trailer_durations"][event["trailer_id"]]
             if trailer_info["arrival_time"]:
-                duration = timestamp - trailer_info["arrival_time"]
+                duration = parse_timestamp(event["timestamp"]) - trailer_info["arrival_time"]
                 trailer_info["total_time"] += duration
                 trailer_info["arrival_time"] = None  # Reset arrival time
 
     return yard_data
 
 
-# Step 3: Calculate granular statistics for each yard
-def calculate_granular_statistics(yard_data):
-    yard_summaries = {}
-
-    for yard_id, data in yard_data.items():
-        total_time = timedelta(0)
-        trailer_times = {}
-        unique_trailers = set()
-
-        for trailer_id, duration_data in data["trailer_durations"].items():
-            total_time += duration_data["total_time"]
-            trailer_times[trailer_id] = duration_data["total_time"]
-            if duration_data["total_time"] > timedelta(0):
-                unique_trailers.add(trailer_id)
-
-        if trailer_times:
-            most_time_trailer = max(trailer_times, key=trailer_times.get)
-            least_time_trailer = min(trailer_times, key=trailer_times.get)
-            average_time = total_time / len(trailer_times)
-        else:
-            most_time_trailer = None
-            least_time_trailer = None
-            average_time = timedelta(0)
-
-        trailer_percentages = {
-            trailer_id: (trailer_times[trailer_id].total_seconds() / total_time.total_seconds()) * 100
-            for trailer_id in trailer_times if total_time > timedelta(0)
-        }
-
-        yard_summaries[yard_id] = {
-            "total_time": total_time,
-            "average_time_per_trailer": average_time,
-            "most_time_trailer": most_time_trailer,
-            "most_time_duration": trailer_times.get(most_time_trailer, timedelta(0)),
-            "least_time_trailer": least_time_trailer,
-            "least_time_duration": trailer_times.get(least_time_trailer, timedelta(0)),
-            "unique_trailers": len(unique_trailers),
-            "trailer_percentages": trailer_percentages,
-        }
-
-    return yard_summaries
+# Step 3: Per-yard statistics are calculated by calculate_granular_statistics in _common
 
 
 # Step 4: Display detailed yard statistics
 def display_granular_statistics(yard_summaries):
+    # Lines are collected and written at once instead of taking the stdout lock per print
+    lines = []
     for yard_id, summary in yard_summaries.items():
-        print(f"Yard {yard_id} Summary:")
-        print(f"  Total Time Spent by All Trailers: {summary['total_time']}")
-        print(f"  Average Time Per Trailer: {summary['average_time_per_trailer']}")
-        print(f"  Trailer with Most Time: {summary['most_time_trailer']} ({summary['most_time_duration']})")
-        print(f"  Trailer with Least Time: {summary['least_time_trailer']} ({summary['least_time_duration']})")
-        print(f"  Unique Trailers: {summary['unique_trailers']}")
-        print("  Percentage of Yard Utilization by Each Trailer:")
+        lines.append(f"Yard {yard_id} Summary:")
+        lines.append(f"  Total Time Spent by All Trailers: {summary['total_time']}")
+        lines.append(f"  Average Time Per Trailer: {summary['average_time_per_trailer']}")
+        lines.append(f"  Trailer with Most Time: {summary['most_time_trailer']} ({summary['most_time_duration']})")
+        lines.append(f"  Trailer with Least Time: {summary['least_time_trailer']} ({summary['least_time_duration']})")
+        lines.append(f"  Unique Trailers: {summary['unique_trailers']}")
+        lines.append("  Percentage of Yard Utilization by Each Trailer:")
         for trailer_id, percentage in summary["trailer_percentages"].items():
-            print(f"    Trailer {trailer_id}: {percentage:.2f}%")
-        print()
+            lines.append(f"    Trailer {trailer_id}: {percentage:.2f}%")
+        lines.append("")
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 # Main Function
 if __name__ == "__main__":
     file_path = "../data_set/events_granular_statistics.json"  # Replace with your JSON file path
-    events = load_json(file_path)
+    events = iter_json(file_path)
     yard_data = process_events(events)
     yard_summaries = calculate_granular_statistics(yard_data)
     display_granular_statistics(yard_summaries)
@@ -48,58 +48,52 @@ Modify time granularity (e.g., use 30-minute intervals).
 '''
 
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-import json
+from collections import defaultdict, deque
 
-# Step 1: Load the JSON dataset
-def load_json(file_path):
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    return data
+from parking_spaces._common import parse_timestamp, sweep_peak_hours
+from parking_spaces._io import iter_json, load_json
+
+__all__ = [
+    "load_json",
+    "iter_json",
+    "process_events",
+    "calculate_peak_hours",
+    "display_results",
+]
 
 # Step 2: Process events to track parking usage by time
 def process_events(events):
     parking_utilization = defaultdict(list)  # {parking_space: [(arrival_time, departure_time)]}
+    open_arrivals = defaultdict(deque)  # {(parking_space, trailer_id): entries still waiting for a departure}
 
     for event in events:
         parking_space = event["parking_space"]
         trailer_id = event["trailer_id"]
-        timestamp = datetime.fromisoformat(event["timestamp"])
+        timestamp = parse_timestamp(event["timestamp"])
         event_type = event["event_type"]
 
         # Track arrivals and departures
         if event_type == "arrived":
-            parking_utilization[parking_space].append({"trailer_id": trailer_id, "arrival_time": timestamp})
+            entry = {"trailer_id": trailer_id, "arrival_time": timestamp}
+            parking_utilization[parking_space].append(entry)
+            open_arrivals[(parking_space, trailer_id)].append(entry)
         elif event_type == "departed":
-            for entry in parking_utilization[parking_space]:
-                if entry["trailer_id"] == trailer_id and "departure_time" not in entry:
-                    entry["departure_time"] = timestamp
-                    break
+            # Match departure with the earliest unmatched arrival for the same trailer
+            waiting = open_arrivals.get((parking_space, trailer_id))
+            if waiting:
+                waiting.popleft()["departure_time"] = timestamp
 
     return parking_utilization
 
 # Step 3: Calculate peak utilization hours
 def calculate_peak_hours(parking_utilization):
-    hour_usage = defaultdict(int)  # {hour: number_of_trailers}
-
-    for parking_space, usage in parking_utilization.items():
-        for entry in usage:
-            if "departure_time" in entry:
-                arrival = entry["arrival_time"]
-                departure = entry["departure_time"]
-
-                # Increment usage for each hour during the trailer's stay
-                current_time = arrival.replace(minute=0, second=0, microsecond=0)
-                while current_time < departure:
-                    hour_usage[current_time] += 1
-                    current_time += timedelta(hours=1)
-
-    # Find the peak hour(s) with maximum utilization
-    max_utilization = max(hour_usage.values(), default=0)
-    peak_hours = [hour for hour, count in hour_usage.items() if count == max_utilization]
-
-    return max_utilization, peak_hours
+    stays = [
+        (entry["arrival_time"], entry["departure_time"])
+        for usage in parking_utilization.values()
+        for entry in usage
+        if "departure_time" in entry
+    ]
+    return sweep_peak_hours(stays)
 
 # Step 4: Display results
 def display_results(max_utilization, peak_hours):
@@ -111,7 +105,7 @@ def display_results(max_utilization, peak_hours):
 # Main Function
 if __name__ == "__main__":
     file_path = "../data_set/events_peak_hours.json"  # Replace with your JSON file path
-    events = load_json(file_path)
+    events = iter_json(file_path)
     parking_utilization = process_events(events)
     max_utilization, peak_hours = calculate_peak_hours(parking_utilization)
     display_results(max_utilization, peak_hours)
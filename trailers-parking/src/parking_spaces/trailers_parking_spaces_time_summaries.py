@@ -47,80 +47,83 @@ Handles edge cases where no trailers exist for a yard.
 
 
 from collections import defaultdict
-from datetime import datetime, timedelta
-import json
+from datetime import timedelta
+import sys
 
-# Step 1: Load the JSON dataset
-def load_json(file_path):
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    return data
+from parking_spaces._common import parse_timestamp
+from parking_spaces._io import iter_json, load_json
+
+__all__ = [
+    "load_json",
+    "iter_json",
+    "process_events",
+    "calculate_trailer_time_summaries",
+    "display_trailer_time_summaries",
+]
 
 # Step 2: Process events to track yard and parking utilization
 def process_events(events):
-    yard_data = defaultdict(lambda: {"arrivals": 0, "departures": 0, "trailer_durations": defaultdict(timedelta)})
+    yard_data = defaultdict(lambda: {"arrivals": 0, "departures": 0, "trailer_durations": {}})
 
     for event in events:
-        yard_id = event["yard_id"]
-        trailer_id = event["trailer_id"]
-        timestamp = datetime.fromisoformat(event["timestamp"])
         event_type = event["event_type"]
 
         if event_type == "arrived":
-            yard_data[yard_id]["arrivals"] += 1
-            yard_data[yard_id]["trailer_durations"][trailer_id] = {"arrival_time": timestamp}
+            yard = yard_data[event["yard_id"]]
+            yard["arrivals"] += 1
+            yard["trailer_durations"][event["trailer_id"]] = {"arrival_time": parse_timestamp(event["timestamp"])}
         elif event_type == "departed":
-            yard_data[yard_id]["departures"] += 1
-            if trailer_id in yard_data[yard_id]["trailer_durations"]:
-                arrival_data = yard_data[yard_id]["trailer_durations"][trailer_id]
-                if "arrival_time" in arrival_data:
-                    duration = timestamp - arrival_data["arrival_time"]
-                    yard_data[yard_id]["trailer_durations"][trailer_id]["total_time"] = duration
+            yard = yard_data[event["yard_id"]]
+            yard["departures"] += 1
+            # Only departures with a recorded arrival need their timestamp parsed
+            arrival_data = yard["trailer_durations"].get(event["trailer_id"])
+            if arrival_data is not None and "arrival_time" in arrival_data:
+                arrival_data["total_time"] = parse_timestamp(event["timestamp"]) - arrival_data["arrival_time"]
 
     return yard_data
 
 # Step 3: Calculate trailers spending the most/least time in each yard
 def calculate_trailer_time_summaries(yard_data):
-    yard_summaries = {}
-
-    for yard_id, data in yard_data.items():
-        trailer_times = {
-            trailer_id: duration_data.get("total_time", timedelta(0))
-            for trailer_id, duration_data in data["trailer_durations"].items()
-        }
-
-        if trailer_times:
-            most_time_trailer = max(trailer_times, key=trailer_times.get)
-            least_time_trailer = min(trailer_times, key=trailer_times.get)
-
-            yard_summaries[yard_id] = {
-                "most_time_trailer": most_time_trailer,
-                "most_time_duration": trailer_times[most_time_trailer],
-                "least_time_trailer": least_time_trailer,
-                "least_time_duration": trailer_times[least_time_trailer],
-            }
-        else:
-            yard_summaries[yard_id] = {
-                "most_time_trailer": None,
-                "most_time_duration": timedelta(0),
-                "least_time_trailer": None,
-                "least_time_duration": timedelta(0),
-            }
-
-    return yard_summaries
+    return {yard_id: _summarize_yard(data) for yard_id, data in yard_data.items()}
+
+def _summarize_yard(data):
+    most_time_trailer = least_time_trailer = None
+    most_time_duration = least_time_duration = timedelta(0)
+
+    # One pass tracks both extremes; strict comparisons keep the first trailer seen on ties
+    for trailer_id, duration_data in data["trailer_durations"].items():
+        total_time = duration_data.get("total_time", timedelta(0))
+        if most_time_trailer is None:
+            most_time_trailer = least_time_trailer = trailer_id
+            most_time_duration = least_time_duration = total_time
+        elif total_time > most_time_duration:
+            most_time_trailer, most_time_duration = trailer_id, total_time
+        elif total_time < least_time_duration:
+            least_time_trailer, least_time_duration = trailer_id, total_time
+
+    return {
+        "most_time_trailer": most_time_trailer,
+        "most_time_duration": most_time_duration,
+        "least_time_trailer": least_time_trailer,
+        "least_time_duration": least_time_duration,
+    }
 
 # Step 4: Display yard-level trailer time summaries
 def display_trailer_time_summaries(yard_summaries):
+    # Lines are collected and written at once instead of taking the stdout lock per print
+    lines = []
     for yard_id, summary in yard_summaries.items():
-        print(f"Yard {yard_id} Summary:")
-        print(f"  Trailer with Most Time: {summary['most_time_trailer']} ({summary['most_time_duration']})")
-        print(f"  Trailer with Least Time: {summary['least_time_trailer']} ({summary['least_time_duration']})")
-        print()
+        lines.append(f"Yard {yard_id} Summary:")
+        lines.append(f"  Trailer with Most Time: {summary['most_time_trailer']} ({summary['most_time_duration']})")
+        lines.append(f"  Trailer with Least Time: {summary['least_time_trailer']} ({summary['least_time_duration']})")
+        lines.append("")
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 # Main Function
 if __name__ == "__main__":
     file_path = "../data_set/events_time_summaries.json"  # Replace with your JSON file path
-    events = load_json(file_path)
+    events = iter_json(file_path)
     yard_data = process_events(events)
     yard_summaries = calculate_trailer_time_summaries(yard_data)
     display_trailer_time_summaries(yard_summaries)
@@ -52,76 +52,38 @@ This solution effectively combines data processing with visual insights, making
 utilization trends.
 
 '''
-import matplotlib.pyplot as plt
-from collections import defaultdict
-from datetime import datetime, timedelta
-import json
-
-# Step 1: Load the JSON dataset
-def load_json(file_path):
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    return data
-
-# Step 2: Process events to track yard and trailer statistics
-def process_events(events):
-    yard_data = defaultdict(lambda: {
-        "arrivals": 0,
-        "departures": 0,
-        "trailer_durations": defaultdict(lambda: {"arrival_time": None, "total_time": timedelta(0)}),
-    })
-
-    for event in events:
-        yard_id = event["yard_id"]
-        trailer_id = event["trailer_id"]
-        timestamp = datetime.fromisoformat(event["timestamp"])
-        event_type = event["event_type"]
-
-        if event_type == "arrived":
-            yard_data[yard_id]["arrivals"] += 1
-            yard_data[yard_id]["trailer_durations"][trailer_id]["arrival_time"] = timestamp
-        elif event_type == "departed":
-            yard_data[yard_id]["departures"] += 1
-            trailer_info = yard_data[yard_id]["trailer_durations"][trailer_id]
-            if trailer_info["arrival_time"]:
-                duration = timestamp - trailer_info["arrival_time"]
-                trailer_info["total_time"] += duration
-                trailer_info["arrival_time"] = None  # Reset arrival time
-
-    return yard_data
-
-# Step 3: Calculate granular statistics for each yard
-def calculate_granular_statistics(yard_data):
-    yard_summaries = {}
-
-    for yard_id, data in yard_data.items():
-        total_time = timedelta(0)
-        trailer_times = {}
-        unique_trailers = set()
-
-        for trailer_id, duration_data in data["trailer_durations"].items():
-            total_time += duration_data["total_time"]
-            trailer_times[trailer_id] = duration_data["total_time"]
-            if duration_data["total_time"] > timedelta(0):
-                unique_trailers.add(trailer_id)
-
-        if trailer_times:
-            trailer_percentages = {
-                trailer_id: (trailer_times[trailer_id].total_seconds() / total_time.total_seconds()) * 100
-                for trailer_id in trailer_times if total_time > timedelta(0)
-            }
-        else:
-            trailer_percentages = {}
-
-        yard_summaries[yard_id] = {
-            "total_time": total_time,
-            "trailer_percentages": trailer_percentages,
-        }
-
-    return yard_summaries
+from parking_spaces._common import calculate_granular_statistics
+from parking_spaces._io import iter_json, load_json
+from parking_spaces.trailers_parking_spaces_granular_statistics import process_events
+
+__all__ = [
+    "load_json",
+    "iter_json",
+    "calculate_granular_statistics",
+    "process_events",
+    "visualize_statistics",
+]
+
+# Step 2: Events are processed by process_events from the granular statistics module
+
+# Step 3: The charted statistics come from calculate_granular_statistics in _common
 
 # Step 4: Visualize yard statistics
-def visualize_statistics(yard_summaries):
+def visualize_statistics(yard_summaries, output_path=None):
+    # Imported here so loading and summarizing events does not pay matplotlib's import cost
+    import matplotlib.pyplot as plt
+
+    # All charts share one figure, so the backend is set up and shown once instead of once per yard
+    pie_yards = [
+        (yard_id, summary["trailer_percentages"])
+        for yard_id, summary in yard_summaries.items()
+        if summary["trailer_percentages"]
+    ]
+    cols = max(1, min(4, len(pie_yards)))
+    pie_rows = (len(pie_yards) + cols - 1) // cols
+    fig = plt.figure(figsize=(max(10, 4 * cols), 5 + 4 * pie_rows))
+    grid = fig.add_gridspec(1 + pie_rows, cols, height_ratios=[5] + [4] * pie_rows)
+
     # Bar Chart: Total Time Spent in Each Yard
     yards = []
     total_times = []
@@ -129,31 +91,34 @@ def visualize_statistics(yard_summaries):
         yards.append(yard_id)
         total_times.append(summary["total_time"].total_seconds() / 3600)  # Convert to hours
 
-    plt.figure(figsize=(10, 5))
-    plt.bar(yards, total_times, color="skyblue")
-    plt.title("Total Time Spent by Trailers in Each Yard")
-    plt.xlabel("Yard")
-    plt.ylabel("Total Time (hours)")
-    plt.show()
+    bar_ax = fig.add_subplot(grid[0, :])
+    bar_ax.bar(yards, total_times, color="skyblue")
+    bar_ax.set_title("Total Time Spent by Trailers in Each Yard")
+    bar_ax.set_xlabel("Yard")
+    bar_ax.set_ylabel("Total Time (hours)")
 
     # Pie Charts: Trailer-Wise Utilization for Each Yard
-    for yard_id, summary in yard_summaries.items():
-        trailer_percentages = summary["trailer_percentages"]
-        if trailer_percentages:
-            plt.figure(figsize=(6, 6))
-            plt.pie(
-                trailer_percentages.values(),
-                labels=trailer_percentages.keys(),
-                autopct="%1.1f%%",
-                startangle=140,
-            )
-            plt.title(f"Trailer-Wise Yard Utilization for Yard {yard_id}")
-            plt.show()
+    for index, (yard_id, trailer_percentages) in enumerate(pie_yards):
+        pie_ax = fig.add_subplot(grid[1 + index // cols, index % cols])
+        pie_ax.pie(
+            trailer_percentages.values(),
+            labels=trailer_percentages.keys(),
+            autopct="%1.1f%%",
+            startangle=140,
+        )
+        pie_ax.set_title(f"Trailer-Wise Yard Utilization for Yard {yard_id}")
+
+    fig.tight_layout()
+    if output_path:
+        fig.savefig(output_path, dpi=100)
+        plt.close(fig)
+    else:
+        plt.show()
 
 # Main Function
 if __name__ == "__main__":
     file_path = "../data_set/events_granular_statistics.json"  # Replace with your JSON file path
-    events = load_json(file_path)
+    events = iter_json(file_path)
     yard_data = process_events(events)
     yard_summaries = calculate_granular_statistics(yard_data)
     visualize_statistics(yard_summaries)
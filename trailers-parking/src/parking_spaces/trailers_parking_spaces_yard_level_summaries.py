@@ -31,94 +31,108 @@ This approach ensures comprehensive yard-level insights, including utilization t
 '''
 
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-import json
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+import sys
 
+from parking_spaces._common import parse_timestamp, sweep_peak_hours
+from parking_spaces._io import iter_json, load_json
 
-# Step 1: Load the JSON dataset
-def load_json(file_path):
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    return data
+__all__ = [
+    "load_json",
+    "iter_json",
+    "process_events",
+    "calculate_yard_summaries",
+    "display_yard_summaries",
+    "summarize_file",
+    "summarize_files",
+]
 
 
 # Step 2: Process events to track yard and parking utilization
 def process_events(events):
     yard_data = defaultdict(lambda: {"arrivals": 0, "departures": 0, "parking_utilization": defaultdict(list)})
+    open_arrivals = defaultdict(deque)  # {(yard_id, parking_space, trailer_id): entries still waiting for a departure}
 
     for event in events:
         yard_id = event["yard_id"]
         parking_space = event["parking_space"]
         trailer_id = event["trailer_id"]
-        timestamp = datetime.fromisoformat(event["timestamp"])
+        timestamp = parse_timestamp(event["timestamp"])
         event_type = event["event_type"]
 
         if event_type == "arrived":
             yard_data[yard_id]["arrivals"] += 1
-            yard_data[yard_id]["parking_utilization"][parking_space].append(
-                {"trailer_id": trailer_id, "arrival_time": timestamp})
+            entry = {"trailer_id": trailer_id, "arrival_time": timestamp}
+            yard_data[yard_id]["parking_utilization"][parking_space].append(entry)
+            open_arrivals[(yard_id, parking_space, trailer_id)].append(entry)
         elif event_type == "departed":
             yard_data[yard_id]["departures"] += 1
-            for entry in yard_data[yard_id]["parking_utilization"][parking_space]:
-                if entry["trailer_id"] == trailer_id and "departure_time" not in entry:
-                    entry["departure_time"] = timestamp
-                    break
+            # Match departure with the earliest unmatched arrival for the same trailer
+            waiting = open_arrivals.get((yard_id, parking_space, trailer_id))
+            if waiting:
+                waiting.popleft()["departure_time"] = timestamp
 
     return yard_data
 
 
 # Step 3: Calculate yard-level utilization and peak hours
 def calculate_yard_summaries(yard_data):
-    yard_summaries = {}
+    return {yard_id: _summarize_yard(data) for yard_id, data in yard_data.items()}
 
-    for yard_id, data in yard_data.items():
-        hour_usage = defaultdict(int)
 
-        # Calculate hour-wise utilization
-        for parking_space, usage in data["parking_utilization"].items():
-            for entry in usage:
-                if "departure_time" in entry:
-                    arrival = entry["arrival_time"]
-                    departure = entry["departure_time"]
+def _summarize_yard(data):
+    stays = [
+        (entry["arrival_time"], entry["departure_time"])
+        for usage in data["parking_utilization"].values()
+        for entry in usage
+        if "departure_time" in entry
+    ]
 
-                    # Increment usage for each hour during the trailer's stay
-                    current_time = arrival.replace(minute=0, second=0, microsecond=0)
-                    while current_time < departure:
-                        hour_usage[current_time] += 1
-                        current_time += timedelta(hours=1)
+    # Determine peak utilization and hours
+    max_utilization, peak_hours = sweep_peak_hours(stays)
 
-        # Determine peak utilization and hours
-        max_utilization = max(hour_usage.values(), default=0)
-        peak_hours = [hour for hour, count in hour_usage.items() if count == max_utilization]
-
-        yard_summaries[yard_id] = {
-            "total_arrivals": data["arrivals"],
-            "total_departures": data["departures"],
-            "peak_utilization": max_utilization,
-            "peak_hours": peak_hours
-        }
-
-    return yard_summaries
+    return {
+        "total_arrivals": data["arrivals"],
+        "total_departures": data["departures"],
+        "peak_utilization": max_utilization,
+        "peak_hours": peak_hours
+    }
 
 
 # Step 4: Display yard-level summaries
 def display_yard_summaries(yard_summaries):
+    # Lines are collected and written at once instead of taking the stdout lock per print
+    lines = []
     for yard_id, summary in yard_summaries.items():
-        print(f"Yard {yard_id} Summary:")
-        print(f"  Total Arrivals: {summary['total_arrivals']}")
-        print(f"  Total Departures: {summary['total_departures']}")
-        print(f"  Peak Utilization: {summary['peak_utilization']} trailers")
-        print("  Peak Hours:")
+        lines.append(f"Yard {yard_id} Summary:")
+        lines.append(f"  Total Arrivals: {summary['total_arrivals']}")
+        lines.append(f"  Total Departures: {summary['total_departures']}")
+        lines.append(f"  Peak Utilization: {summary['peak_utilization']} trailers")
+        lines.append("  Peak Hours:")
         for hour in summary["peak_hours"]:
-            print(f"    {hour.strftime('%Y-%m-%d %H:%M:%S')}")
-        print()
+            lines.append(f"    {hour.strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append("")
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Step 5: Summarize many event files, e.g. one per yard and day
+def summarize_file(file_path):
+    return calculate_yard_summaries(process_events(iter_json(file_path)))
+
+
+def summarize_files(file_paths, max_workers=None, chunksize=4):
+    # Files are independent, so they are spread across processes; chunksize batches small files per task
+    file_paths = list(file_paths)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(file_paths, executor.map(summarize_file, file_paths, chunksize=chunksize)))
 
 
 # Main Function
 if __name__ == "__main__":
     file_path = "../data_set/events_yard_summaries.json"  # Replace with your JSON file path
-    events = load_json(file_path)
+    events = iter_json(file_path)
     yard_data = process_events(events)
     yard_summaries = calculate_yard_summaries(yard_data)
     display_yard_summaries(yard_summaries)
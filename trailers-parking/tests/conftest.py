@@ -0,0 +1,5 @@
+import os
+
+# Render charts off-screen so matplotlib skips GUI backend discovery; set through the
+# environment so matplotlib itself is only imported by the tests that draw
+os.environ.setdefault("MPLBACKEND", "Agg")
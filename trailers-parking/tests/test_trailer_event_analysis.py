@@ -1,7 +1,6 @@
 import json
 from datetime import datetime
 import pytest
-from pathlib import Path
 
 from src.parking_spaces.Tralier_Event_Analysis import TrailerEventAnalyzer
 
@@ -124,3 +123,44 @@ def test_get_events_in_timerange(json_file_path):
     # Expect the first two events only: 2025-01-01T08:30:00 and 2025-01-02T09:15:00
     assert len(events_jan_1_to_2) == 2
     assert all(e.yard_id == "YARD-001" for e in events_jan_1_to_2)
+
+
+def test_load_data_mixed_naive_and_utc_timestamps(tmp_path):
+    # One yard records naive local times, the other UTC times with a "Z" suffix
+    test_file = tmp_path / "mixed_events.json"
+    with open(test_file, "w") as f:
+        json.dump([
+            {"event_id": "E1", "yard_id": "YARD-001", "event_type": "LOAD",
+             "timestamp": "2025-01-01T08:30:00", "trailer_id": "TRAILER-1"},
+            {"event_id": "E2", "yard_id": "YARD-001", "event_type": "UNLOAD",
+             "timestamp": "2025-01-03T09:15:00", "trailer_id": "TRAILER-2"},
+            {"event_id": "E3", "yard_id": "YARD-002", "event_type": "ENTER",
+             "timestamp": "2025-01-03T10:00:00Z", "trailer_id": "TRAILER-3"},
+        ], f)
+
+    analyzer = TrailerEventAnalyzer(filepath=str(test_file))
+    analyzer.load_data()
+
+    assert len(analyzer.events) == 3
+    assert analyzer.get_event_count_by_yard() == {"YARD-001": 2, "YARD-002": 1}
+    assert analyzer.get_event_distribution_for_yard("YARD-002") == {"ENTER": 1}
+    # Per-yard spans only compare that yard's timestamps
+    assert analyzer.get_average_events_per_day("YARD-001") == 1.0
+    assert analyzer.get_average_events_per_day("YARD-002") == 1.0
+
+
+def test_load_data_numeric_ids(tmp_path):
+    test_file = tmp_path / "numeric_ids.json"
+    with open(test_file, "w") as f:
+        json.dump([
+            {"event_id": 1, "yard_id": 1, "event_type": "LOAD",
+             "timestamp": "2025-01-01T08:30:00", "trailer_id": 1001},
+            {"event_id": 2, "yard_id": 1, "event_type": "LOAD",
+             "timestamp": "2025-01-02T08:30:00", "trailer_id": None},
+        ], f)
+
+    analyzer = TrailerEventAnalyzer(filepath=str(test_file))
+    analyzer.load_data()
+
+    assert analyzer.get_event_count_by_yard() == {1: 2}
+    assert analyzer.events[1].trailer_id is None
@@ -1,13 +1,13 @@
 
 import json
 import pytest
-import os
-from datetime import datetime
-from pathlib import Path
+from datetime import datetime, timezone
 from src.parking_spaces.trailers_parking_spaces import (
     load_json,
+    load_ndjson,
     process_events,
     calculate_utilization,
+    summarize_events,
     TrailerEvent,
     TrailerEventAnalyzer
 )
@@ -48,6 +48,20 @@ def test_load_json(tmp_path):
     assert result[0]["event_id"] == "e1"
     assert result[1]["event_type"] == "departed"
 
+def test_load_ndjson(tmp_path):
+    # One event per line; blank lines are skipped
+    test_file = tmp_path / "test_events.ndjson"
+    test_file.write_text(
+        '{"event_id": "e1", "event_type": "arrived"}\n'
+        '\n'
+        '{"event_id": "e2", "event_type": "departed"}\n'
+    )
+
+    result = load_ndjson(test_file)
+
+    assert [event["event_id"] for event in result] == ["e1", "e2"]
+    assert result[1]["event_type"] == "departed"
+
 # --------------------------------------------------
 # 2. Test process_events
 # --------------------------------------------------
@@ -99,6 +113,25 @@ def test_process_events():
     assert parking_utilization["p2"][0]["trailer_id"] == "t2"
     assert "departure_time" not in parking_utilization["p2"][0]  # not yet departed
 
+def test_process_events_pairs_repeat_visits_in_order():
+    # The same trailer parks in p1 twice; each departure closes the oldest open visit
+    events = [
+        {"event_id": "e1", "timestamp": "2024-01-01T08:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e2", "timestamp": "2024-01-01T09:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+        {"event_id": "e3", "timestamp": "2024-01-01T10:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e4", "timestamp": "2024-01-01T12:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+    ]
+
+    _, parking_utilization = process_events(events)
+
+    assert len(parking_utilization["p1"]) == 2
+    assert parking_utilization["p1"][0]["departure_time"] == datetime(2024, 1, 1, 9, 0, 0)
+    assert parking_utilization["p1"][1]["departure_time"] == datetime(2024, 1, 1, 12, 0, 0)
+
 # --------------------------------------------------
 # 3. Test calculate_utilization
 # --------------------------------------------------
@@ -132,6 +165,27 @@ def test_calculate_utilization():
     # For p2, there's no departure_time, so usage is 0
     assert utilization_stats["p2"] == 0.0
 
+def test_summarize_events_matches_two_pass_pipeline():
+    events = [
+        {"event_id": "e1", "timestamp": "2024-01-01T08:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e2", "timestamp": "2024-01-01T09:30:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+        {"event_id": "e3", "timestamp": "2024-01-01T10:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e4", "timestamp": "2024-01-01T12:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+        {"event_id": "e5", "timestamp": "2024-01-01T15:00:00", "yard_id": "y2",
+         "trailer_id": "t2", "event_type": "arrived", "parking_space": "p2"},
+    ]
+
+    yard_stats, utilization_stats = summarize_events(events)
+
+    expected_yard_stats, parking_utilization = process_events(events)
+    assert yard_stats == expected_yard_stats
+    assert utilization_stats == calculate_utilization(parking_utilization)
+    assert utilization_stats == {"p1": 3.5, "p2": 0.0}
+
 # --------------------------------------------------
 # 4. Test the TrailerEvent class
 # --------------------------------------------------
@@ -161,12 +215,24 @@ def test_trailer_event_invalid_timestamp():
     assert event.timestamp is None  # fallback as per class code
     assert event.event_id == "e2"
 
+def test_trailer_event_utc_suffix_timestamp():
+    # A trailing "Z" marks UTC and should parse on every supported Python version
+    event = TrailerEvent(
+        event_id="e3",
+        yard_id="y1",
+        event_type="arrived",
+        parking_space="p1",
+        timestamp="2024-01-01T12:00:00Z",
+        trailer_id="t1"
+    )
+    assert event.timestamp == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
 # --------------------------------------------------
 # 5. Test the TrailerEventAnalyzer class
 # --------------------------------------------------
-@pytest.fixture
-def sample_json_file(tmp_path):
-    # Create a temporary JSON file for testing
+@pytest.fixture(scope="module")
+def sample_json_file(tmp_path_factory):
+    # Create a temporary JSON file for testing, once per module; tests that rewrite it use a copy
     data = [
         {
             "event_id": "e1",
@@ -193,7 +259,7 @@ def sample_json_file(tmp_path):
             "parking_space": "p2"
         }
     ]
-    file_path = tmp_path / "events.json"
+    file_path = tmp_path_factory.mktemp("analyzer") / "events.json"
     with open(file_path, "w") as f:
         json.dump(data, f)
     return file_path
@@ -239,3 +305,98 @@ def test_trailer_event_analyzer_get_utilization_stats(sample_json_file):
     assert stats["p1"] == 1
     # p2: arrived at 15:00, no departure => 0 hours
     assert stats["p2"] == 0
+
+def test_trailer_event_analyzer_reload_recomputes(tmp_path, sample_json_file):
+    events_file = tmp_path / "events.json"
+    events_file.write_bytes(sample_json_file.read_bytes())
+    analyzer = TrailerEventAnalyzer(str(events_file))
+    analyzer.load_data()
+    # Repeated access reuses the cached result
+    assert analyzer.get_yard_stats() is analyzer.get_yard_stats()
+    assert analyzer.get_utilization_stats()["p1"] == 1
+
+    with open(events_file, "w") as f:
+        json.dump([
+            {
+                "event_id": "e4",
+                "timestamp": "2024-01-02T08:00:00",
+                "yard_id": "y3",
+                "trailer_id": "t3",
+                "event_type": "arrived",
+                "parking_space": "p3"
+            }
+        ], f)
+    analyzer.load_data()
+
+    assert "y1" not in analyzer.get_yard_stats()
+    assert analyzer.get_yard_stats()["y3"]["arrivals"] == 1
+    assert analyzer.get_utilization_stats() == {"p3": 0}
+    assert len(analyzer.get_parking_departure()["p3"]) == 1
+
+def test_trailer_event_analyzer_load_directory(tmp_path, sample_json_file):
+    # One file per day; the analyzer reads every file in the directory, in name order
+    day_dir = tmp_path / "days"
+    day_dir.mkdir()
+    events = json.loads(sample_json_file.read_text())
+    (day_dir / "2024-01-01.json").write_text(json.dumps(events[:2]))
+    (day_dir / "2024-01-02.json").write_text(json.dumps(events[2:]))
+    (day_dir / "notes.txt").write_text("not an event file")
+
+    analyzer = TrailerEventAnalyzer(str(day_dir))
+    analyzer.load_data(max_workers=2)
+
+    assert [event.event_id for event in analyzer.events] == ["e1", "e2", "e3"]
+    assert analyzer.get_utilization_stats() == {"p1": 1, "p2": 0}
+
+def test_trailer_event_analyzer_invalid_timestamps_keep_counts(tmp_path):
+    events_file = tmp_path / "events.json"
+    events_file.write_text(json.dumps([
+        {"event_id": "e1", "timestamp": "not-a-date", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e2", "timestamp": "2024-01-01T13:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+        {"event_id": "e3", "timestamp": "2024-01-01T14:00:00", "yard_id": "y1",
+         "trailer_id": "t2", "event_type": "arrived", "parking_space": "p2"},
+        {"event_id": "e4", "timestamp": "", "yard_id": "y1",
+         "trailer_id": "t2", "event_type": "departed", "parking_space": "p2"},
+    ]))
+    analyzer = TrailerEventAnalyzer(str(events_file))
+    analyzer.load_data()
+
+    # Counts do not depend on the timestamps; stays missing one add no usage time
+    assert analyzer.get_yard_stats()["y1"] == {"arrivals": 2, "departures": 2}
+    assert analyzer.get_utilization_stats() == {"p1": 0, "p2": 0}
+
+def test_trailer_event_analyzer_departure_only_space(tmp_path):
+    events_file = tmp_path / "events.json"
+    events_file.write_text(json.dumps([
+        {"event_id": "e1", "timestamp": "2024-01-01T12:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e2", "timestamp": "2024-01-01T14:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+        {"event_id": "e3", "timestamp": "2024-01-01T15:00:00", "yard_id": "y1",
+         "trailer_id": "t2", "event_type": "departed", "parking_space": "p2"},
+    ]))
+    analyzer = TrailerEventAnalyzer(str(events_file))
+    analyzer.load_data()
+
+    # A space with only a departure is reported with no usage hours, as before
+    assert analyzer.get_utilization_stats() == {"p1": 2, "p2": 0}
+    assert "p2" in analyzer.get_parking_departure()
+    assert analyzer.get_parking_departure()["p2"] == []
+
+def test_trailer_event_analyzer_numeric_and_null_ids(tmp_path):
+    events_file = tmp_path / "events.json"
+    events_file.write_text(json.dumps([
+        {"event_id": 1, "timestamp": "2024-01-01T12:00:00", "yard_id": 7,
+         "trailer_id": 1001, "event_type": "arrived", "parking_space": None},
+        {"event_id": 2, "timestamp": "2024-01-01T14:00:00", "yard_id": 7,
+         "trailer_id": 1001, "event_type": "departed", "parking_space": None},
+    ]))
+    analyzer = TrailerEventAnalyzer(str(events_file))
+    analyzer.load_data()
+
+    # Non-string IDs are kept as they are rather than interned
+    assert analyzer.events[0].trailer_id == 1001
+    assert analyzer.get_yard_stats()[7] == {"arrivals": 1, "departures": 1}
+    assert analyzer.get_utilization_stats() == {None: 2}
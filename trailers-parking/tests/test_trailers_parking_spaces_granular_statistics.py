@@ -1,7 +1,6 @@
-import os
 import json
 import pytest
-from datetime import datetime, timedelta
+from datetime import timedelta
 from io import StringIO
 from unittest.mock import patch
 
@@ -13,6 +12,53 @@ from src.parking_spaces.trailers_parking_spaces_granular_statistics import (
     display_granular_statistics
 )
 
+# Built once at import; the fixture hands each test its own list
+_SAMPLE_EVENTS = (
+    {
+        "event_id": "e1",
+        "timestamp": "2024-01-01T12:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t1",
+        "event_type": "arrived"
+    },
+    {
+        "event_id": "e2",
+        "timestamp": "2024-01-01T14:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t1",
+        "event_type": "departed"
+    },
+    {
+        "event_id": "e3",
+        "timestamp": "2024-01-01T13:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t2",
+        "event_type": "arrived"
+    },
+    {
+        "event_id": "e4",
+        "timestamp": "2024-01-01T13:30:00",
+        "yard_id": "y1",
+        "trailer_id": "t2",
+        "event_type": "departed"
+    },
+    {
+        "event_id": "e5",
+        "timestamp": "2024-01-01T15:00:00",
+        "yard_id": "y2",
+        "trailer_id": "t3",
+        "event_type": "arrived"
+    },
+    {
+        "event_id": "e6",
+        "timestamp": "2024-01-01T16:30:00",
+        "yard_id": "y2",
+        "trailer_id": "t3",
+        "event_type": "departed"
+    },
+)
+
+
 @pytest.fixture
 def sample_events():
     """
@@ -20,50 +66,7 @@ def sample_events():
     in events_granular_statistics.json. This can be adjusted to your own
     testing needs or to match your real data shape.
     """
-    return [
-        {
-            "event_id": "e1",
-            "timestamp": "2024-01-01T12:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t1",
-            "event_type": "arrived"
-        },
-        {
-            "event_id": "e2",
-            "timestamp": "2024-01-01T14:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t1",
-            "event_type": "departed"
-        },
-        {
-            "event_id": "e3",
-            "timestamp": "2024-01-01T13:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t2",
-            "event_type": "arrived"
-        },
-        {
-            "event_id": "e4",
-            "timestamp": "2024-01-01T13:30:00",
-            "yard_id": "y1",
-            "trailer_id": "t2",
-            "event_type": "departed"
-        },
-        {
-            "event_id": "e5",
-            "timestamp": "2024-01-01T15:00:00",
-            "yard_id": "y2",
-            "trailer_id": "t3",
-            "event_type": "arrived"
-        },
-        {
-            "event_id": "e6",
-            "timestamp": "2024-01-01T16:30:00",
-            "yard_id": "y2",
-            "trailer_id": "t3",
-            "event_type": "departed"
-        }
-    ]
+    return list(_SAMPLE_EVENTS)
 
 
 def test_load_json(tmp_path):
@@ -1,67 +1,71 @@
 import json
 import pytest
-from datetime import datetime
-from collections import defaultdict
-from pathlib import Path
+from datetime import datetime, timedelta, timezone
 
 # Import the methods we want to test
 # Adjust the path as needed depending on your project layout
 from src.parking_spaces.trailers_parking_spaces_peak_hours import (
     load_json,
+    iter_json,
     process_events,
     calculate_peak_hours
 )
 
 
+# Built once at import; the fixture hands each test its own list
+_SAMPLE_EVENTS = (
+    {
+        "event_id": "e1",
+        "timestamp": "2024-01-01T12:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t1",
+        "event_type": "arrived",
+        "parking_space": "p1"
+    },
+    {
+        "event_id": "e2",
+        "timestamp": "2024-01-01T13:30:00",
+        "yard_id": "y1",
+        "trailer_id": "t1",
+        "event_type": "departed",
+        "parking_space": "p1"
+    },
+    {
+        "event_id": "e3",
+        "timestamp": "2024-01-01T12:30:00",
+        "yard_id": "y1",
+        "trailer_id": "t2",
+        "event_type": "arrived",
+        "parking_space": "p2"
+    },
+    {
+        "event_id": "e4",
+        "timestamp": "2024-01-01T15:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t2",
+        "event_type": "departed",
+        "parking_space": "p2"
+    },
+)
+
+
 @pytest.fixture
 def sample_events():
     """
     Returns a list of event dictionaries to simulate a small set of arrive/depart events.
     We’ll reuse this fixture for multiple tests.
     """
-    return [
-        {
-            "event_id": "e1",
-            "timestamp": "2024-01-01T12:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t1",
-            "event_type": "arrived",
-            "parking_space": "p1"
-        },
-        {
-            "event_id": "e2",
-            "timestamp": "2024-01-01T13:30:00",
-            "yard_id": "y1",
-            "trailer_id": "t1",
-            "event_type": "departed",
-            "parking_space": "p1"
-        },
-        {
-            "event_id": "e3",
-            "timestamp": "2024-01-01T12:30:00",
-            "yard_id": "y1",
-            "trailer_id": "t2",
-            "event_type": "arrived",
-            "parking_space": "p2"
-        },
-        {
-            "event_id": "e4",
-            "timestamp": "2024-01-01T15:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t2",
-            "event_type": "departed",
-            "parking_space": "p2"
-        }
-    ]
+    return list(_SAMPLE_EVENTS)
 
 
-@pytest.fixture
-def sample_json_file(tmp_path, sample_events):
+@pytest.fixture(scope="module")
+def sample_json_file(tmp_path_factory):
     """
     Creates a temporary JSON file with sample event data for testing load_json().
+    Written once per module, since the tests only read it.
     """
-    test_file = tmp_path / "test_events.json"
-    test_file.write_text(json.dumps(sample_events))
+    test_file = tmp_path_factory.mktemp("peak_hours") / "test_events.json"
+    test_file.write_text(json.dumps(_SAMPLE_EVENTS))
     return test_file
 
 
@@ -74,6 +78,18 @@ def test_load_json(sample_json_file):
     assert data[0]["event_id"] == "e1", "First event should have event_id='e1'"
 
 
+def test_iter_json_feeds_process_events(sample_json_file, sample_events):
+    """
+    iter_json should stream the same events as load_json, and process_events
+    should accept the stream directly.
+    """
+    assert list(iter_json(sample_json_file)) == sample_events
+
+    parking_utilization = process_events(iter_json(sample_json_file))
+    max_utilization, _ = calculate_peak_hours(parking_utilization)
+    assert max_utilization == 2
+
+
 def test_process_events(sample_events):
     """
     Test process_events to ensure arrivals and departures are correctly recorded.
@@ -137,3 +153,106 @@ def test_calculate_peak_hours_no_data():
     max_utilization, peak_hours = calculate_peak_hours(parking_utilization)
     assert max_utilization == 0, "With no events, peak utilization should be 0"
     assert peak_hours == [], "No peak hours when there are no events"
+
+
+def test_calculate_peak_hours_multi_day_stay():
+    """
+    A week-long stay overlapped by a short visit should peak only during the overlap,
+    and a departure exactly on the hour should not count that hour.
+    """
+    parking_utilization = {
+        "p1": [{"trailer_id": "t1",
+                "arrival_time": datetime(2024, 1, 1, 8, 15),
+                "departure_time": datetime(2024, 1, 8, 8, 0)}],
+        "p2": [{"trailer_id": "t2",
+                "arrival_time": datetime(2024, 1, 3, 10, 0),
+                "departure_time": datetime(2024, 1, 3, 12, 0)}],
+    }
+    max_utilization, peak_hours = calculate_peak_hours(parking_utilization)
+
+    assert max_utilization == 2
+    assert peak_hours == [datetime(2024, 1, 3, 10, 0), datetime(2024, 1, 3, 11, 0)]
+
+
+def test_process_events_pairs_repeat_visits_in_order():
+    """
+    A trailer that visits the same space twice should have each departure matched
+    with its own arrival, earliest first.
+    """
+    events = [
+        {"event_id": "e1", "timestamp": "2024-01-01T08:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e2", "timestamp": "2024-01-01T09:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+        {"event_id": "e3", "timestamp": "2024-01-01T10:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "arrived", "parking_space": "p1"},
+        {"event_id": "e4", "timestamp": "2024-01-01T11:00:00", "yard_id": "y1",
+         "trailer_id": "t1", "event_type": "departed", "parking_space": "p1"},
+    ]
+    parking_utilization = process_events(events)
+
+    assert [(e["arrival_time"].hour, e["departure_time"].hour) for e in parking_utilization["p1"]] == [(8, 9), (10, 11)]
+
+
+def test_calculate_peak_hours_stays_years_apart():
+    """
+    Stays spread over more than a year take the sparse sweep path and should
+    report the same peak hours as stays close together.
+    """
+    parking_utilization = {
+        "p1": [{"trailer_id": "t1",
+                "arrival_time": datetime(2022, 1, 1, 12, 0),
+                "departure_time": datetime(2022, 1, 1, 13, 30)}],
+        "p2": [{"trailer_id": "t2",
+                "arrival_time": datetime(2024, 6, 1, 9, 45),
+                "departure_time": datetime(2024, 6, 1, 10, 15)}],
+    }
+    max_utilization, peak_hours = calculate_peak_hours(parking_utilization)
+
+    assert max_utilization == 1
+    assert peak_hours == [datetime(2022, 1, 1, 12, 0), datetime(2022, 1, 1, 13, 0),
+                          datetime(2024, 6, 1, 9, 0), datetime(2024, 6, 1, 10, 0)]
+
+
+def test_calculate_peak_hours_mixed_offsets():
+    """
+    Stays covering the same instants but recorded with different UTC offsets
+    should overlap, and the peak hours should be reported in the first stay's offset.
+    """
+    eastern = timezone(timedelta(hours=-5))
+    parking_utilization = {
+        "p1": [{"trailer_id": "t1",
+                "arrival_time": datetime(2024, 1, 1, 7, 0, tzinfo=eastern),
+                "departure_time": datetime(2024, 1, 1, 9, 0, tzinfo=eastern)}],
+        "p2": [{"trailer_id": "t2",
+                "arrival_time": datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc),
+                "departure_time": datetime(2024, 1, 1, 14, 0, tzinfo=timezone.utc)}],
+    }
+    max_utilization, peak_hours = calculate_peak_hours(parking_utilization)
+
+    assert max_utilization == 2
+    assert peak_hours == [datetime(2024, 1, 1, 7, 0, tzinfo=eastern),
+                          datetime(2024, 1, 1, 8, 0, tzinfo=eastern)]
+    assert all(hour.utcoffset() == timedelta(hours=-5) for hour in peak_hours)
+
+
+@pytest.mark.parametrize("offset, arrival, departure, expected_hours", [
+    (timedelta(hours=-8), (12, 10), (13, 20), [12, 13]),
+    (timedelta(hours=5, minutes=30), (12, 0), (13, 0), [12]),
+])
+def test_calculate_peak_hours_uniform_offset(offset, arrival, departure, expected_hours):
+    """
+    Data recorded with a single non-UTC offset, whole-hour or fractional, should
+    be bucketed by its own wall-clock hours.
+    """
+    zone = timezone(offset)
+    parking_utilization = {
+        "p1": [{"trailer_id": "t1",
+                "arrival_time": datetime(2024, 1, 1, *arrival, tzinfo=zone),
+                "departure_time": datetime(2024, 1, 1, *departure, tzinfo=zone)}],
+    }
+    max_utilization, peak_hours = calculate_peak_hours(parking_utilization)
+
+    assert max_utilization == 1
+    assert peak_hours == [datetime(2024, 1, 1, hour, 0, tzinfo=zone) for hour in expected_hours]
+    assert all(hour.utcoffset() == offset for hour in peak_hours)
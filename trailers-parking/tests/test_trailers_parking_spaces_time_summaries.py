@@ -1,9 +1,6 @@
-import os
 import json
 import pytest
-from datetime import datetime, timedelta
-from unittest.mock import patch
-from io import StringIO
+from datetime import timedelta
 
 # Assuming your code is in src/trailers_parking_spaces_time_summaries.py
 from src.parking_spaces.trailers_parking_spaces_time_summaries import (
@@ -13,56 +10,60 @@ from src.parking_spaces.trailers_parking_spaces_time_summaries import (
     display_trailer_time_summaries,
 )
 
+# Built once at import; the fixture hands each test its own list
+_SAMPLE_EVENTS = (
+    {
+        "event_id": "e1",
+        "timestamp": "2024-01-01T12:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t1",
+        "event_type": "arrived"
+    },
+    {
+        "event_id": "e2",
+        "timestamp": "2024-01-01T14:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t1",
+        "event_type": "departed"
+    },
+    {
+        "event_id": "e3",
+        "timestamp": "2024-01-01T13:00:00",
+        "yard_id": "y1",
+        "trailer_id": "t2",
+        "event_type": "arrived"
+    },
+    {
+        "event_id": "e4",
+        "timestamp": "2024-01-01T13:30:00",
+        "yard_id": "y1",
+        "trailer_id": "t2",
+        "event_type": "departed"
+    },
+    {
+        "event_id": "e5",
+        "timestamp": "2024-01-01T15:00:00",
+        "yard_id": "y2",
+        "trailer_id": "t3",
+        "event_type": "arrived"
+    },
+    {
+        "event_id": "e6",
+        "timestamp": "2024-01-01T16:30:00",
+        "yard_id": "y2",
+        "trailer_id": "t3",
+        "event_type": "departed"
+    },
+)
+
+
 @pytest.fixture
 def sample_events():
     """
     Returns a list of sample events that simulates
     'arrived' and 'departed' usage for multiple yards and trailers.
     """
-    return [
-        {
-            "event_id": "e1",
-            "timestamp": "2024-01-01T12:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t1",
-            "event_type": "arrived"
-        },
-        {
-            "event_id": "e2",
-            "timestamp": "2024-01-01T14:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t1",
-            "event_type": "departed"
-        },
-        {
-            "event_id": "e3",
-            "timestamp": "2024-01-01T13:00:00",
-            "yard_id": "y1",
-            "trailer_id": "t2",
-            "event_type": "arrived"
-        },
-        {
-            "event_id": "e4",
-            "timestamp": "2024-01-01T13:30:00",
-            "yard_id": "y1",
-            "trailer_id": "t2",
-            "event_type": "departed"
-        },
-        {
-            "event_id": "e5",
-            "timestamp": "2024-01-01T15:00:00",
-            "yard_id": "y2",
-            "trailer_id": "t3",
-            "event_type": "arrived"
-        },
-        {
-            "event_id": "e6",
-            "timestamp": "2024-01-01T16:30:00",
-            "yard_id": "y2",
-            "trailer_id": "t3",
-            "event_type": "departed"
-        },
-    ]
+    return list(_SAMPLE_EVENTS)
 
 
 def test_load_json(tmp_path):
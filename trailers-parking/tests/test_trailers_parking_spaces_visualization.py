@@ -1,8 +1,7 @@
-import os
-import json
+import orjson
 import pytest
-from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
+from unittest.mock import patch
+from datetime import timedelta
 from src.parking_spaces.trailers_parking_spaces_visualization import (
     load_json,
     process_events,
@@ -10,7 +9,7 @@ from src.parking_spaces.trailers_parking_spaces_visualization import (
     visualize_statistics,
 )
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_events():
     """
     Provide a small set of sample events in JSON-like structure for tests.
@@ -61,6 +60,14 @@ def sample_events():
         }
     ]
 
+@pytest.fixture(scope="module")
+def processed(sample_events):
+    """
+    process_events output for sample_events, built once and shared by the
+    tests that only read it.
+    """
+    return process_events(sample_events)
+
 def test_load_json(tmp_path):
     """
     Test load_json by creating a temporary JSON file and verifying
@@ -68,8 +75,7 @@ def test_load_json(tmp_path):
     """
     test_file = tmp_path / "test_events.json"
     sample_data = [{"event_id": "e1", "timestamp": "2024-01-01T12:00:00"}]
-    with open(test_file, "w") as f:
-        json.dump(sample_data, f)
+    test_file.write_bytes(orjson.dumps(sample_data))
 
     loaded_data = load_json(str(test_file))
     assert loaded_data == sample_data, "load_json should return the correct data from file."
@@ -94,13 +100,12 @@ def test_process_events(sample_events):
     assert isinstance(t1_info["total_time"], timedelta), "Trailer total_time should be a timedelta object."
     assert t1_info["arrival_time"] is None, "After processing, arrival_time should be reset to None if departed."
 
-def test_calculate_granular_statistics(sample_events):
+def test_calculate_granular_statistics(processed):
     """
     Test calculate_granular_statistics by verifying the total time
     and trailer percentages are correctly computed.
     """
-    yard_data = process_events(sample_events)
-    yard_summaries = calculate_granular_statistics(yard_data)
+    yard_summaries = calculate_granular_statistics(processed)
 
     # Check that y1 has the correct total time for t1 (2 hours) and t2 (0.5 hours).
     # Combined total: 2.5 hours => 9000 seconds
@@ -125,13 +130,12 @@ def test_calculate_granular_statistics(sample_events):
     assert 99.9 < t3_percent < 100.1, "t3 should be ~100% of y2 total time."
 
 @patch("matplotlib.pyplot.show")
-def test_visualize_statistics(mock_show, sample_events):
+def test_visualize_statistics(mock_show, processed):
     """
     Test visualize_statistics by verifying that no errors are raised
     during plotting. We patch `plt.show()` to avoid displaying actual plots.
     """
-    yard_data = process_events(sample_events)
-    yard_summaries = calculate_granular_statistics(yard_data)
+    yard_summaries = calculate_granular_statistics(processed)
 
     # We just want to ensure it runs without error.
     try:
@@ -139,6 +143,19 @@ def test_visualize_statistics(mock_show, sample_events):
     except Exception as e:
         pytest.fail(f"visualize_statistics raised an exception: {e}")
 
-    # Assert that plt.show() was called (once for bar chart, plus once per yard with data)
-    # y1 has trailer_percentages, y2 has trailer_percentages => total 1 bar chart + 2 pie charts => 3 calls
-    assert mock_show.call_count == 3, "Expected 3 calls to plt.show() (1 for bar chart + 2 pie charts)."
+    # The bar chart and both yards' pie charts share one figure => a single plt.show() call
+    assert mock_show.call_count == 1, "Expected 1 call to plt.show() for the combined figure."
+
+@patch("matplotlib.pyplot.show")
+def test_visualize_statistics_saves_to_file(mock_show, processed, tmp_path):
+    """
+    Test that visualize_statistics writes the combined figure to output_path
+    instead of showing it.
+    """
+    yard_summaries = calculate_granular_statistics(processed)
+    output_path = tmp_path / "yards.png"
+
+    visualize_statistics(yard_summaries, output_path=output_path)
+
+    assert output_path.stat().st_size > 0, "The figure should be written to output_path."
+    mock_show.assert_not_called()
@@ -1,9 +1,5 @@
 import pytest
-import os
-import json
-import tempfile
-from datetime import datetime
-from collections import defaultdict
+import orjson
 
 # Import the functions from your src/ module.
 # Adjust the import path if your project structure differs.
@@ -11,10 +7,11 @@ from src.parking_spaces.trailers_parking_spaces_yard_level_summaries import (
     load_json,
     process_events,
     calculate_yard_summaries,
-    display_yard_summaries
+    display_yard_summaries,
+    summarize_files
 )
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_events():
     """
     Returns a list of sample event dicts similar to what might appear
@@ -72,22 +69,26 @@ def sample_events():
     ]
 
 
-def test_load_json(sample_events):
+@pytest.fixture(scope="module")
+def processed(sample_events):
     """
-    Test the load_json function by creating a temporary JSON file, then
+    process_events output for sample_events, built once and shared by the
+    tests that only read it.
+    """
+    return process_events(sample_events)
+
+
+def test_load_json(tmp_path, sample_events):
+    """
+    Test the load_json function by writing a JSON file to pytest's tmp_path, then
     checking if load_json reads it correctly.
     """
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as tmp_file:
-        json.dump(sample_events, tmp_file)
-        tmp_file_path = tmp_file.name
+    tmp_file_path = tmp_path / "events.json"
+    tmp_file_path.write_bytes(orjson.dumps(sample_events))
 
-    try:
-        loaded_data = load_json(tmp_file_path)
-        assert len(loaded_data) == len(sample_events), "Loaded data length mismatch."
-        assert loaded_data[0]["event_id"] == "e1", "First event ID should be e1."
-    finally:
-        # Clean up the temp file
-        os.remove(tmp_file_path)
+    loaded_data = load_json(tmp_file_path)
+    assert len(loaded_data) == len(sample_events), "Loaded data length mismatch."
+    assert loaded_data[0]["event_id"] == "e1", "First event ID should be e1."
 
 
 def test_process_events(sample_events):
@@ -116,13 +117,12 @@ def test_process_events(sample_events):
     assert "departure_time" in y1_p1_usage[0], "Trailer t1 departure_time should be recorded."
 
 
-def test_calculate_yard_summaries(sample_events):
+def test_calculate_yard_summaries(processed):
     """
     Test calculate_yard_summaries to ensure it correctly computes the
     peak utilization and corresponding peak hours.
     """
-    yard_data = process_events(sample_events)
-    yard_summaries = calculate_yard_summaries(yard_data)
+    yard_summaries = calculate_yard_summaries(processed)
 
     assert "y1" in yard_summaries, "y1 should be in yard_summaries."
     y1_summary = yard_summaries["y1"]
@@ -143,13 +143,12 @@ def test_calculate_yard_summaries(sample_events):
     assert len(y2_summary["peak_hours"]) >= 1, "y2 should have at least one peak hour."
 
 
-def test_display_yard_summaries(capfd, sample_events):
+def test_display_yard_summaries(capfd, processed):
     """
     Test display_yard_summaries by capturing the stdout output and verifying
     expected yard summary lines appear.
     """
-    yard_data = process_events(sample_events)
-    yard_summaries = calculate_yard_summaries(yard_data)
+    yard_summaries = calculate_yard_summaries(processed)
 
     # Capture printed output
     display_yard_summaries(yard_summaries)
@@ -165,3 +164,21 @@ def test_display_yard_summaries(capfd, sample_events):
     assert "Total Arrivals: 1" in output, "Output should show 1 arrival for y2."
     assert "Total Departures: 1" in output, "Output should show 1 departure for y2."
     assert "Peak Utilization: 1 trailers" in output, "Output should show peak utilization=1 for y2."
+
+
+def test_summarize_files(tmp_path, sample_events, processed):
+    """
+    Test summarize_files by summarizing two event files in worker processes and
+    comparing each result with the single-file pipeline.
+    """
+    first = tmp_path / "yard_day1.json"
+    second = tmp_path / "yard_day2.json"
+    first.write_bytes(orjson.dumps(sample_events))
+    second.write_bytes(orjson.dumps(sample_events[:2]))
+
+    summaries = summarize_files([first, second], max_workers=2)
+
+    assert list(summaries) == [first, second], "Results should be keyed by file, in input order."
+    assert summaries[first] == calculate_yard_summaries(processed)
+    assert summaries[second]["y1"]["total_arrivals"] == 1, "Second file has a single arrival."
+    assert "y2" not in summaries[second], "Second file has no events for y2."